@@ -41,15 +41,15 @@ class McpServices(ApiHandler):
                 org_id = input.get("org_id") or (
                     tenant_ctx.org_id if not tenant_ctx.is_system else None
                 )
-                services = user_store.list_services(db, org_id=org_id)
+                services = user_store.list_services_lite(db, org_id=org_id)
                 return {"ok": True, "data": [_service_to_dict(s) for s in services]}
 
         # Write operations require admin permission
         user = self._get_user_id()
         if user:
-            from python.helpers.rbac import check_permission
+            from python.helpers.rbac import check_permission, tenant_domain
 
-            domain = f"org:{tenant_ctx.org_id}/team:{tenant_ctx.team_id}"
+            domain = tenant_domain(tenant_ctx.org_id, tenant_ctx.team_id)
             if not check_permission(user, domain, "admin", "mcp"):
                 return Response(
                     json.dumps({"error": "Forbidden"}),
@@ -73,7 +73,6 @@ class McpServices(ApiHandler):
                     default_scopes=input.get("default_scopes"),
                     icon_url=input.get("icon_url"),
                 )
-                db.flush()
                 return {"ok": True, "data": _service_to_dict(svc)}
 
         elif action == "update":
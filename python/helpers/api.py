@@ -68,31 +68,32 @@ class ApiHandler:
             if perm is not None:
                 user = g.current_user
                 if user is not None:  # Skip RBAC in no-auth mode
-                    if not user.get("is_system_admin"):
-                        try:
-                            from python.helpers.rbac import check_permission
-
-                            domain = (
-                                f"org:{user.get('org_id', 'default')}"
-                                f"/team:{user.get('team_id', 'default')}"
-                            )
-                            if not check_permission(
-                                str(user["id"]), domain, perm[0], perm[1]
-                            ):
-                                return Response(
-                                    json.dumps({"error": "Forbidden"}),
-                                    status=403,
-                                    mimetype="application/json",
-                                )
-                        except RuntimeError as e:
-                            PrintStyle.error(f"RBAC check failed: {e}")
+                    try:
+                        from python.helpers.rbac import check_permission, tenant_domain
+
+                        domain = tenant_domain(
+                            user.get("org_id", "default"),
+                            user.get("team_id", "default"),
+                        )
+                        if not check_permission(
+                            str(user["id"]),
+                            domain,
+                            perm[0],
+                            perm[1],
+                            is_system_admin=bool(user.get("is_system_admin", False)),
+                        ):
                             return Response(
-                                json.dumps(
-                                    {"error": "Authorization service unavailable"}
-                                ),
-                                status=503,
+                                json.dumps({"error": "Forbidden"}),
+                                status=403,
                                 mimetype="application/json",
                             )
+                    except RuntimeError as e:
+                        PrintStyle.error(f"RBAC check failed: {e}")
+                        return Response(
+                            json.dumps({"error": "Authorization service unavailable"}),
+                            status=503,
+                            mimetype="application/json",
+                        )
 
             # input data from request based on type
             input_data: Input = {}
@@ -19,11 +19,12 @@ Usage::
     Never include tokens, secrets, or credentials in *details*.
 """
 
+import asyncio
 import json
 from datetime import datetime, timezone
 from uuid import uuid4
 
-from sqlalchemy import Column, DateTime, ForeignKey, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, String, Text, insert
 
 from python.helpers import auth_db
 from python.helpers.auth_db import Base
@@ -57,16 +58,23 @@ async def create_audit_entry(
     break the main request path.
     """
     try:
-        with auth_db.get_session() as db:
-            entry = AuditLog(
-                id=str(uuid4()),
-                user_id=user_id,
-                action=action,
-                resource=resource,
-                details_json=json.dumps(details) if details else None,
-                ip_address=ip,
-                timestamp=datetime.now(timezone.utc),
-            )
-            db.add(entry)
+        row = {
+            "id": str(uuid4()),
+            "user_id": user_id,
+            "action": action,
+            "resource": resource,
+            "details_json": json.dumps(details) if details else None,
+            "ip_address": ip,
+            "timestamp": datetime.now(timezone.utc),
+        }
+        # The write is blocking DB I/O; keep it off the caller's event loop
+        await asyncio.to_thread(_write_audit_row, row)
     except Exception as e:
         PrintStyle.error(f"Audit log write failed: {e}")
+
+
+def _write_audit_row(row: dict) -> None:
+    """Insert one audit row in its own auth_db session."""
+    with auth_db.get_session() as db:
+        # Entries are write-only here, so skip ORM instance bookkeeping
+        db.execute(insert(AuditLog).values(**row))
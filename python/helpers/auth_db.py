@@ -13,8 +13,9 @@ from collections.abc import Generator
 from contextlib import contextmanager
 
 from sqlalchemy import create_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from python.helpers.print_style import PrintStyle
 
@@ -55,6 +56,10 @@ def init_db(url: str | None = None) -> None:
     if url.startswith("sqlite"):
         # SQLite is not thread-safe by default; allow multi-threaded access
         connect_args["check_same_thread"] = False
+        if _is_sqlite_memory_url(url):
+            # One shared connection, so every thread and the Casbin adapter see
+            # the same database instead of a fresh empty one per connection.
+            engine_kwargs["poolclass"] = StaticPool
     else:
         # PostgreSQL connection pool tuning
         engine_kwargs.update(
@@ -72,6 +77,12 @@ def init_db(url: str | None = None) -> None:
     PrintStyle.info(f"Auth database initialized ({url.split('://')[0]} backend)")
 
 
+def _is_sqlite_memory_url(url: str) -> bool:
+    """Return True for SQLite URLs that point at an in-memory database."""
+    database = make_url(url).database
+    return not database or database == ":memory:" or "mode=memory" in url
+
+
 def get_engine() -> Engine:
     """Return the auth database engine.
 
@@ -21,6 +21,7 @@ Usage::
 """
 
 import time
+from collections.abc import Callable
 
 
 class LoginProtection:
@@ -29,19 +30,22 @@ class LoginProtection:
     MAX_ATTEMPTS: int = 5
     LOCKOUT_DURATION: int = 300  # seconds (5 minutes)
     PROGRESSIVE_DELAYS: list[float] = [0, 1, 2, 4, 8]
+    # Delay indexed directly by failure count (slot 0 is never used)
+    _DELAY_TABLE: tuple[float, ...] = (0, *PROGRESSIVE_DELAYS)
 
-    def __init__(self) -> None:
-        self._attempts: dict[str, list[float]] = {}
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        # username -> (consecutive failures, monotonic time of the latest one)
+        self._state: dict[str, tuple[int, float]] = {}
 
     def check_locked(self, username: str) -> bool:
         """Return True if the account is currently locked out."""
-        attempts = self._attempts.get(username, [])
-        if len(attempts) < self.MAX_ATTEMPTS:
+        count, last_attempt = self._state.get(username, (0, 0.0))
+        if count < self.MAX_ATTEMPTS:
             return False
-        last_attempt = attempts[-1]
-        if time.monotonic() - last_attempt > self.LOCKOUT_DURATION:
+        if self._clock() - last_attempt > self.LOCKOUT_DURATION:
             # Lockout expired — clear history
-            self._attempts.pop(username, None)
+            self._state.pop(username, None)
             return False
         return True
 
@@ -49,30 +53,29 @@ class LoginProtection:
         """Record a failed login attempt.
 
         Returns the number of seconds the caller should delay before
-        responding (progressive backoff).
+        responding (progressive backoff).  Failures are counted until a
+        full lockout window passes without one.
         """
-        now = time.monotonic()
-        attempts = self._attempts.setdefault(username, [])
+        now = self._clock()
+        count, last_attempt = self._state.get(username, (0, now))
+        if now - last_attempt > self.LOCKOUT_DURATION:
+            count = 0
 
-        # Prune attempts older than the lockout window
-        cutoff = now - self.LOCKOUT_DURATION
-        self._attempts[username] = [t for t in attempts if t > cutoff]
-        attempts = self._attempts[username]
-
-        attempts.append(now)
-        idx = min(len(attempts) - 1, len(self.PROGRESSIVE_DELAYS) - 1)
-        return self.PROGRESSIVE_DELAYS[idx]
+        count += 1
+        self._state[username] = (count, now)
+        delays = self._DELAY_TABLE
+        return delays[count] if count < len(delays) else delays[-1]
 
     def record_success(self, username: str) -> None:
         """Clear attempt history on successful login."""
-        self._attempts.pop(username, None)
+        self._state.pop(username, None)
 
     def lockout_remaining(self, username: str) -> float:
         """Return seconds remaining in lockout, or 0 if not locked."""
-        attempts = self._attempts.get(username, [])
-        if len(attempts) < self.MAX_ATTEMPTS:
+        count, last_attempt = self._state.get(username, (0, 0.0))
+        if count < self.MAX_ATTEMPTS:
             return 0
-        elapsed = time.monotonic() - attempts[-1]
+        elapsed = self._clock() - last_attempt
         remaining = self.LOCKOUT_DURATION - elapsed
         return max(0, remaining)
 
@@ -40,6 +40,8 @@ class VaultTokenStorage:
     def __init__(self, user_id: str, service_id: str):
         self._user_id = user_id
         self._service_id = service_id
+        # Vault owner_id for this connection's token/client-info entries
+        self._vault_owner_id = f"{user_id}:{service_id}"
 
     # -- TokenStorage protocol methods --------------------------------------
 
@@ -89,7 +91,7 @@ class VaultTokenStorage:
                 access_entry = user_store.store_vault_key(
                     db,
                     "mcp_token",
-                    f"{self._user_id}:{self._service_id}",
+                    self._vault_owner_id,
                     "access_token",
                     tokens.access_token,
                 )
@@ -99,7 +101,7 @@ class VaultTokenStorage:
                     refresh_entry = user_store.store_vault_key(
                         db,
                         "mcp_token",
-                        f"{self._user_id}:{self._service_id}",
+                        self._vault_owner_id,
                         "refresh_token",
                         tokens.refresh_token,
                     )
@@ -147,7 +149,7 @@ class VaultTokenStorage:
                 entry = user_store.store_vault_key(
                     db,
                     "mcp_token",
-                    f"{self._user_id}:{self._service_id}",
+                    self._vault_owner_id,
                     "client_info",
                     client_json,
                 )
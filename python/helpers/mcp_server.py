@@ -1,7 +1,9 @@
 import contextvars
+import hashlib
 import os
 import threading
 import time
+from collections import OrderedDict
 from typing import Annotated, Literal, Union
 from urllib.parse import urlparse
 
@@ -105,10 +107,12 @@ def require_scopes_or_token_path(*scopes: str):
     For Bearer-authenticated requests we enforce the given scopes.
     """
 
+    required = frozenset(scopes)
+
     def check(ctx: AuthContext) -> bool:
         if ctx.token is None:
             return True  # token-in-path mode — no scope enforcement
-        return all(s in ctx.token.scopes for s in scopes)
+        return required.issubset(ctx.token.scopes)
 
     return check
 
@@ -141,58 +145,138 @@ async def _get_mcp_user() -> dict | None:
 # ---------------------------------------------------------------------------
 
 
+# Recent RBAC decisions keyed by a digest of the raw bearer token, so a client
+# reusing its token does not hit the auth DB on every MCP request.
+_rbac_token_cache: OrderedDict[str, tuple[float, bool]] = OrderedDict()
+_rbac_token_cache_lock = threading.Lock()
+_RBAC_CACHE_MAX = 1024
+_RBAC_CACHE_TTL = 5.0  # seconds; bounds how long a role change goes unnoticed
+
+
+def _rbac_cache_key(token) -> str | None:
+    raw = getattr(token, "token", None)
+    if not isinstance(raw, str):
+        return None
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def _rbac_cache_get(key: str) -> bool | None:
+    with _rbac_token_cache_lock:
+        entry = _rbac_token_cache.get(key)
+        if entry is None:
+            return None
+        deadline, allowed = entry
+        if deadline <= time.monotonic():
+            del _rbac_token_cache[key]
+            return None
+        _rbac_token_cache.move_to_end(key)
+        return allowed
+
+
+def _rbac_cache_put(key: str, token, allowed: bool) -> None:
+    ttl = _RBAC_CACHE_TTL
+    expires_at = getattr(token, "expires_at", None)
+    if isinstance(expires_at, (int, float)):
+        ttl = min(ttl, expires_at - time.time())
+    if ttl <= 0:
+        return
+    with _rbac_token_cache_lock:
+        _rbac_token_cache[key] = (time.monotonic() + ttl, allowed)
+        _rbac_token_cache.move_to_end(key)
+        if len(_rbac_token_cache) > _RBAC_CACHE_MAX:
+            _rbac_token_cache.popitem(last=False)
+
+
 def require_rbac_mcp_access(ctx: AuthContext) -> bool:
     """Custom auth check: verify Casbin allows MCP access for this user.
 
     Passes unconditionally for token-in-path requests (no Bearer token).
     For Bearer-authenticated requests, looks up the user in the auth DB
-    and checks Casbin RBAC policies.
+    and checks Casbin RBAC policies. Decisions are cached per bearer token
+    for at most ``_RBAC_CACHE_TTL`` seconds and never past the token's expiry.
     """
     if ctx.token is None:
         return True  # token-in-path mode
 
-    user_id = ctx.token.claims.get("oid")
+    # AccessToken.claims is optional; a token without claims has no oid
+    user_id = (ctx.token.claims or {}).get("oid")
     if not user_id:
         return False
 
+    cache_key = _rbac_cache_key(ctx.token)
+    if cache_key is not None:
+        cached = _rbac_cache_get(cache_key)
+        if cached is not None:
+            return cached
+
     try:
         from python.helpers import auth_db, user_store
-        from python.helpers.rbac import get_enforcer
+        from python.helpers.rbac import check_permission, tenant_domain
 
         with auth_db.get_session() as db:
             user = user_store.get_user_by_id(db, user_id)
             if not user:
-                return False
-            org_id = user.primary_org_id or "*"
-            # Find first team membership for domain construction
-            team_id = "*"
-            if user.team_memberships:
-                team_id = user.team_memberships[0].team_id
-            domain = f"org:{org_id}/team:{team_id}"
-            return get_enforcer().enforce(user_id, domain, "mcp", "execute")
+                allowed = False  # cached too: unknown users must not hit the DB
+            else:
+                org_id = user.primary_org_id or "*"
+                # Find first team membership for domain construction
+                team_id = "*"
+                if user.team_memberships:
+                    team_id = user.team_memberships[0].team_id
+                domain = tenant_domain(org_id, team_id)
+                allowed = check_permission(user_id, domain, "mcp", "execute")
     except Exception as e:
+        # Not cached: the next request retries once the DB is reachable.
         _PRINTER.print(f"[MCP] RBAC check failed: {e}")
         return False
 
+    if cache_key is not None:
+        _rbac_cache_put(cache_key, ctx.token, allowed)
+    return allowed
+
 
 # ---------------------------------------------------------------------------
 # MCP rate limiting (per-user, in-memory)
 # ---------------------------------------------------------------------------
 
-_mcp_rate_limits: dict[str, list[float]] = {}
+# user_id -> (requests in the previous window, requests in the current window,
+# monotonic start of the current window).  The previous window's count is
+# weighted by how much of it still overlaps the trailing minute, which
+# approximates a sliding window in O(1) without allowing a double burst
+# across a window boundary.
+_mcp_rate_limits: dict[str, tuple[int, int, float]] = {}
 _MCP_RATE_LIMIT = 100  # requests per minute
 _MCP_RATE_WINDOW = 60  # seconds
+_MCP_RATE_SWEEP_EVERY = 10_000  # checks between sweeps of idle users
+_mcp_rate_checks = 0
 
 
 def _check_mcp_rate_limit(user_id: str) -> bool:
     """Return True if the user is within rate limits, False if exceeded."""
+    global _mcp_rate_checks  # noqa: PLW0603
+
     now = time.monotonic()
-    cutoff = now - _MCP_RATE_WINDOW
-    attempts = _mcp_rate_limits.get(user_id, [])
-    attempts = [t for t in attempts if t > cutoff]
-    attempts.append(now)
-    _mcp_rate_limits[user_id] = attempts
-    return len(attempts) <= _MCP_RATE_LIMIT
+    _mcp_rate_checks += 1
+    if _mcp_rate_checks >= _MCP_RATE_SWEEP_EVERY:
+        _mcp_rate_checks = 0
+        idle_cutoff = now - _MCP_RATE_WINDOW * 4
+        for uid, (_, _, start) in list(_mcp_rate_limits.items()):
+            if start < idle_cutoff:
+                del _mcp_rate_limits[uid]
+
+    previous, current, start = _mcp_rate_limits.get(user_id, (0, 0, now))
+    elapsed = now - start
+    if elapsed >= _MCP_RATE_WINDOW:
+        # Roll over; a gap of two or more windows leaves nothing to carry.
+        previous = current if elapsed < 2 * _MCP_RATE_WINDOW else 0
+        current = 0
+        start += (elapsed // _MCP_RATE_WINDOW) * _MCP_RATE_WINDOW
+        elapsed = now - start
+    overlap = 1 - elapsed / _MCP_RATE_WINDOW
+    if previous * overlap + current >= _MCP_RATE_LIMIT:
+        return False
+    _mcp_rate_limits[user_id] = (previous, current + 1, start)
+    return True
 
 
 # ---------------------------------------------------------------------------
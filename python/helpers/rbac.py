@@ -21,9 +21,19 @@ Usage::
 
     # Per-request
     allowed = check_permission(user_id, domain, resource, action)
+
+Permission decisions are memoized per ``(user, domain, resource, action)``
+and invalidated whenever policies change through this module.  Code that
+mutates the enforcer directly must call :func:`invalidate_permission_cache`.
 """
 
+import copy
+import sys
+import threading
+from functools import lru_cache
+
 import casbin
+from casbin.model import Model
 
 from python.helpers import auth_db, user_store
 from python.helpers.files import get_abs_path
@@ -35,8 +45,27 @@ from python.helpers.print_style import PrintStyle
 
 _enforcer: casbin.Enforcer | None = None
 
+# Bumped on every policy mutation; part of the decision cache key so stale
+# decisions are never returned after roles or policies change.
+_policy_version = 0
+
+# Reverse index user_id -> roles granted by sync_user_roles, so role diffs do
+# not have to scan the grouping-policy list.  Seeded lazily from the enforcer.
+_user_roles: dict[str, frozenset[str]] = {}
+
+# p rules grouped by subject as (domain, resource, action); rebuilt lazily
+# after every invalidation.  Mirrors the matcher in conf/rbac_model.conf.
+_policies_by_role: dict[str, list[tuple[str, str, str]]] | None = None
+
+# Guards publishing _policies_by_role against a concurrent invalidation, so an
+# index built from a superseded policy set is never installed.
+_index_lock = threading.Lock()
+
 _RBAC_MODEL_PATH = "conf/rbac_model.conf"
 
+# Parsed once; every enforcer gets a deep copy since policies load into it.
+_model_template: Model | None = None
+
 
 def init_enforcer() -> casbin.Enforcer:
     """Initialize the Casbin enforcer (lazy singleton).
@@ -54,13 +83,48 @@ def init_enforcer() -> casbin.Enforcer:
     engine = auth_db.get_engine()
     adapter = Adapter(engine)
 
-    model_path = get_abs_path(_RBAC_MODEL_PATH)
-    _enforcer = casbin.Enforcer(model_path, adapter)
+    _enforcer = casbin.Enforcer(_new_model(), adapter)
+    _enforcer.add_function("keyMatch", _key_match)
+    _user_roles.clear()
+    invalidate_permission_cache()
 
     PrintStyle.info("RBAC enforcer initialized")
     return _enforcer
 
 
+def _new_model() -> Model:
+    """Return a fresh copy of the RBAC model, parsing the .conf only once."""
+    global _model_template  # noqa: PLW0603
+
+    if _model_template is None:
+        template = Model()
+        template.load_model(get_abs_path(_RBAC_MODEL_PATH))
+        _model_template = template
+    return copy.deepcopy(_model_template)
+
+
+# pattern -> literal prefix before the first "*" (None for wildcard-free patterns)
+_key_match_prefixes: dict[str, str | None] = {}
+
+
+def _key_match(key: str, pattern: str) -> bool:
+    """Drop-in replacement for Casbin's ``keyMatch`` with a per-pattern cache.
+
+    Same semantics as the built-in: a ``*`` matches any suffix, otherwise the
+    strings must be equal.  Exact matches short-circuit, and the wildcard
+    prefix of each policy pattern is computed once instead of per row.
+    """
+    if key == pattern:
+        return True
+    try:
+        prefix = _key_match_prefixes[pattern]
+    except KeyError:
+        star = pattern.find("*")
+        prefix = None if star == -1 else pattern[:star]
+        _key_match_prefixes[pattern] = prefix
+    return prefix is not None and key.startswith(prefix)
+
+
 def get_enforcer() -> casbin.Enforcer:
     """Return the cached Casbin enforcer.
 
@@ -77,7 +141,14 @@ def get_enforcer() -> casbin.Enforcer:
 # ---------------------------------------------------------------------------
 
 
-def check_permission(user_id: str, domain: str, resource: str, action: str) -> bool:
+def check_permission(
+    user_id: str,
+    domain: str,
+    resource: str,
+    action: str,
+    *,
+    is_system_admin: bool = False,
+) -> bool:
     """Check whether a user has permission in the given domain.
 
     Args:
@@ -85,12 +156,67 @@ def check_permission(user_id: str, domain: str, resource: str, action: str) -> b
         domain: Tenant domain, e.g. ``"org:acme/team:eng"``.
         resource: Resource name, e.g. ``"chats"``, ``"settings"``.
         action: Action name, e.g. ``"read"``, ``"write"``, ``"create"``.
+        is_system_admin: The caller already knows the user is a system
+            admin; allow without consulting the enforcer.
 
     Returns:
         True if the user is allowed, False otherwise.
     """
+    if is_system_admin:
+        return True
+    get_enforcer()  # raise early if not initialized; never cache that case
+    return _cached_enforce(_policy_version, user_id, domain, resource, action)
+
+
+@lru_cache(maxsize=4096)
+def _cached_enforce(
+    policy_version: int, user_id: str, domain: str, resource: str, action: str
+) -> bool:
+    """Memoized decision keyed on the current policy version.
+
+    Evaluates the model's matcher against only the ``p`` rules of the user
+    and their (transitive) roles, instead of letting Casbin scan every rule.
+    """
+    global _policies_by_role  # noqa: PLW0603
+
     enforcer = get_enforcer()
-    return enforcer.enforce(user_id, domain, resource, action)
+    index = _policies_by_role
+    if index is None:
+        index = {}
+        for sub, dom, obj, act in enforcer.get_policy():
+            index.setdefault(sub, []).append((dom, obj, act))
+        with _index_lock:
+            if _policy_version == policy_version:
+                _policies_by_role = index
+
+    for subject in (user_id, *enforcer.get_implicit_roles_for_user(user_id)):
+        for dom, obj, act in index.get(subject, ()):
+            if (
+                _key_match(domain, dom)
+                and _key_match(resource, obj)
+                and _key_match(action, act)
+            ):
+                return True
+    return False
+
+
+@lru_cache(maxsize=1024)
+def tenant_domain(org_id: str, team_id: str) -> str:
+    """Return the interned Casbin domain string for an org/team pair."""
+    return sys.intern(f"org:{org_id}/team:{team_id}")
+
+
+def invalidate_permission_cache() -> None:
+    """Discard all memoized permission decisions.
+
+    Called automatically by the policy-mutating helpers in this module.
+    """
+    global _policy_version, _policies_by_role  # noqa: PLW0603
+
+    with _index_lock:
+        _policy_version += 1
+        _policies_by_role = None
+    _cached_enforce.cache_clear()
 
 
 # ---------------------------------------------------------------------------
@@ -104,56 +230,133 @@ def sync_user_roles(user_id: str) -> None:
     Reads the user's org and team memberships from the auth database and
     replaces their Casbin ``g`` policies accordingly.  Roles are assigned
     globally (no domain in grouping) — domain scoping is handled by the
-    ``p`` policy rules.
+    ``p`` policy rules.  Only the difference between the current and the
+    desired role set is written to the enforcer.
     """
     enforcer = get_enforcer()
 
-    # Remove all existing grouping policies for this user
-    enforcer.remove_filtered_grouping_policy(0, user_id)
-
-    roles_added: set[str] = set()
-
+    desired: set[str] = set()
     with auth_db.get_session() as db:
         user = user_store.get_user_by_id(db, user_id)
-        if user is None:
-            return
-
-        # System admin role
-        if user.is_system_admin:
-            enforcer.add_grouping_policy(user_id, "system_admin")
-            roles_added.add("system_admin")
-
-        # Org memberships
-        for om in user.org_memberships:
-            role = _map_org_role(om.role)
-            if role not in roles_added:
-                enforcer.add_grouping_policy(user_id, role)
-                roles_added.add(role)
-
-        # Team memberships
-        for tm in user.team_memberships:
-            role = _map_team_role(tm.role)
-            if role not in roles_added:
-                enforcer.add_grouping_policy(user_id, role)
-                roles_added.add(role)
+        if user is not None:
+            # System admin role
+            if user.is_system_admin:
+                desired.add("system_admin")
+            # Org memberships
+            desired.update(_map_org_role(om.role) for om in user.org_memberships)
+            # Team memberships
+            desired.update(_map_team_role(tm.role) for tm in user.team_memberships)
+
+    current = _current_roles(enforcer, user_id)
+    stale = [[user_id, role] for role in current - desired]
+    missing = [[user_id, role] for role in desired - current]
+    try:
+        # Batch calls are all-or-nothing in Casbin; if a rule was changed
+        # outside this module, fall back to applying the rules one by one.
+        if stale and not enforcer.remove_grouping_policies(stale):
+            for rule in stale:
+                enforcer.remove_grouping_policy(*rule)
+        if missing and not enforcer.add_grouping_policies(missing):
+            for rule in missing:
+                enforcer.add_grouping_policy(*rule)
+        _user_roles[user_id] = frozenset(desired)
+    except Exception:
+        _user_roles.pop(user_id, None)  # reseed from the enforcer next time
+        raise
+    finally:
+        invalidate_permission_cache()
+
+
+def get_user_roles(user_id: str) -> frozenset[str]:
+    """Return the Casbin roles currently granted to *user_id*."""
+    return _current_roles(get_enforcer(), user_id)
+
+
+def _current_roles(enforcer: casbin.Enforcer, user_id: str) -> frozenset[str]:
+    """Look up a user's roles in the reverse index, seeding it on first use."""
+    roles = _user_roles.get(user_id)
+    if roles is None:
+        roles = frozenset(map(sys.intern, enforcer.get_roles_for_user(user_id)))
+        _user_roles[user_id] = roles
+    return roles
+
+
+# Auth DB membership role -> Casbin role name; unknown roles map to "member".
+_ORG_ROLE_MAP: dict[str, str] = {
+    "owner": "org_owner",
+    "admin": "org_admin",
+    "member": "member",
+}
+
+_TEAM_ROLE_MAP: dict[str, str] = {
+    "lead": "team_lead",
+    "member": "member",
+    "viewer": "viewer",
+}
 
 
 def _map_org_role(db_role: str) -> str:
     """Map auth DB org membership role to Casbin role name."""
-    return {
-        "owner": "org_owner",
-        "admin": "org_admin",
-        "member": "member",
-    }.get(db_role, "member")
+    return _ORG_ROLE_MAP.get(db_role, "member")
 
 
 def _map_team_role(db_role: str) -> str:
     """Map auth DB team membership role to Casbin role name."""
-    return {
-        "lead": "team_lead",
-        "member": "member",
-        "viewer": "viewer",
-    }.get(db_role, "member")
+    return _TEAM_ROLE_MAP.get(db_role, "member")
+
+
+# ---------------------------------------------------------------------------
+# Tenant-scoped policy loading
+# ---------------------------------------------------------------------------
+
+
+def load_tenant_policies(org_id: str) -> None:
+    """Reload the enforcer with only the rules relevant to one organization.
+
+    Keeps every ``p`` rule, but only the ``g`` rules whose subject is a
+    policy role, a member of the org, or a system admin.  Meant
+    for workers that serve a single tenant: the enforcer is a process-wide
+    singleton, so users outside *org_id* are denied until
+    :func:`clear_tenant_policies` restores the full policy set.
+    """
+    from casbin_sqlalchemy_adapter import CasbinRule
+    from casbin_sqlalchemy_adapter.adapter import Filter
+
+    enforcer = get_enforcer()
+
+    with auth_db.get_session() as db:
+        subjects = {
+            row.v0 for row in db.query(CasbinRule.v0).filter(CasbinRule.ptype == "p")
+        }
+        subjects.update(
+            row.user_id
+            for row in db.query(user_store.OrgMembership.user_id).filter(
+                user_store.OrgMembership.org_id == org_id
+            )
+        )
+        subjects.update(
+            row.id
+            for row in db.query(user_store.User.id).filter(
+                user_store.User.is_system_admin.is_(True)
+            )
+        )
+
+    tenant_filter = Filter()
+    tenant_filter.v0 = sorted(subjects)
+    try:
+        enforcer.load_filtered_policy(tenant_filter)
+    finally:
+        _user_roles.clear()
+        invalidate_permission_cache()
+
+
+def clear_tenant_policies() -> None:
+    """Undo :func:`load_tenant_policies` by reloading every stored rule."""
+    try:
+        get_enforcer().load_policy()
+    finally:
+        _user_roles.clear()
+        invalidate_permission_cache()
 
 
 # ---------------------------------------------------------------------------
@@ -161,7 +364,7 @@ def _map_team_role(db_role: str) -> str:
 # ---------------------------------------------------------------------------
 
 # (role, domain_pattern, resource, action)
-_DEFAULT_POLICIES: list[tuple[str, str, str, str]] = [
+_DEFAULT_POLICIES: tuple[tuple[str, str, str, str], ...] = (
     # system_admin: full access to everything
     ("system_admin", "*", "*", "*"),
     # org_owner: full access within their org
@@ -221,24 +424,23 @@ _DEFAULT_POLICIES: list[tuple[str, str, str, str]] = [
     ("viewer", "org:*/team:*", "skills", "read"),
     ("viewer", "org:*/team:*", "agents", "read"),
     ("viewer", "org:*/team:*", "system", "read"),
-]
+)
 
 
 def seed_default_policies() -> None:
     """Idempotently seed the default RBAC policy rules.
 
-    Checks for each rule before adding to avoid duplicates on repeated
-    bootstrap calls.
+    Only rules missing from the enforcer are added, in a single batch, so
+    repeated bootstrap calls never create duplicates.
     """
     enforcer = get_enforcer()
 
-    added = 0
-    for role, domain, resource, action in _DEFAULT_POLICIES:
-        if not enforcer.has_policy(role, domain, resource, action):
-            enforcer.add_policy(role, domain, resource, action)
-            added += 1
+    existing = {tuple(rule) for rule in enforcer.get_policy()}
+    missing = [list(rule) for rule in _DEFAULT_POLICIES if rule not in existing]
 
-    if added:
-        PrintStyle.info(f"RBAC: seeded {added} default policy rules")
+    if missing:
+        enforcer.add_policies(missing)
+        invalidate_permission_cache()
+        PrintStyle.info(f"RBAC: seeded {len(missing)} default policy rules")
     else:
         PrintStyle.info("RBAC: default policies already present")
@@ -3,6 +3,7 @@ from __future__ import annotations
 import os
 import re
 from dataclasses import dataclass
+from functools import cached_property
 
 from python.helpers import files
 
@@ -79,48 +80,49 @@ class TenantContext:
         )
 
     # -- Path properties -------------------------------------------------------
+    # Paths are derived from frozen fields, so each is computed once per instance.
 
     @property
     def is_system(self) -> bool:
         return self.user_id == SYSTEM_USER_ID
 
-    @property
+    @cached_property
     def user_dir(self) -> str:
         """Relative path to the user's data root (e.g. usr/orgs/default/teams/default/members/{user_id})."""
         return f"usr/orgs/{self.org_id}/teams/{self.team_id}/members/{self.user_id}"
 
-    @property
+    @cached_property
     def team_dir(self) -> str:
         return f"usr/orgs/{self.org_id}/teams/{self.team_id}"
 
-    @property
+    @cached_property
     def org_dir(self) -> str:
         return f"usr/orgs/{self.org_id}"
 
-    @property
+    @cached_property
     def chats_dir(self) -> str:
         return f"{self.user_dir}/chats"
 
-    @property
+    @cached_property
     def memory_subdir(self) -> str:
         """User's private FAISS memory subdir (relative, used as key in Memory.index)."""
         return f"orgs/{self.org_id}/teams/{self.team_id}/members/{self.user_id}/default"
 
-    @property
+    @cached_property
     def settings_file(self) -> str:
         """Relative path to the user's settings override file."""
         return f"{self.user_dir}/settings.json"
 
-    @property
+    @cached_property
     def secrets_file(self) -> str:
         """Relative path to the user's encrypted secrets file."""
         return f"{self.user_dir}/secrets.env"
 
-    @property
+    @cached_property
     def uploads_dir(self) -> str:
         return f"{self.user_dir}/uploads"
 
-    @property
+    @cached_property
     def workdir(self) -> str:
         return f"{self.user_dir}/workdir"
 
@@ -6,6 +6,7 @@ registry, and MCP connections.  All models inherit from the shared
 ``Base`` declared in :mod:`python.helpers.auth_db`.
 """
 
+import json
 import uuid
 from datetime import datetime, timezone
 
@@ -20,13 +21,38 @@ from sqlalchemy import (
     Integer,
     String,
     Text,
+    Row,
     UniqueConstraint,
+    case,
+    insert,
+    select,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import (
+    Session,
+    contains_eager,
+    raiseload,
+    relationship,
+    selectinload,
 )
-from sqlalchemy.orm import Session, relationship
 
 from python.helpers import vault_crypto
 from python.helpers.auth_db import Base
 
+# Bound once; ids are generated on every insert.
+_uuid4 = uuid.uuid4
+
+# resolve_api_key cascade order: lower wins.
+_VAULT_OWNER_PRIORITY = {"user": 0, "team": 1, "org": 2, "system": 3}
+
+# Dialect-specific INSERT constructs that support ON CONFLICT upserts.
+_UPSERT_INSERTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert,
+}
+
 # ---------------------------------------------------------------------------
 # ORM Models
 # ---------------------------------------------------------------------------
@@ -231,7 +257,7 @@ class ExternalIdentity(Base):
 
     __tablename__ = "external_identities"
 
-    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = Column(String, primary_key=True, default=lambda: str(_uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False)
     platform = Column(String, nullable=False)
     external_user_id = Column(String, nullable=False)
@@ -277,7 +303,7 @@ def verify_password(user: User, password: str) -> bool:
 
 def get_user_by_id(db: Session, user_id: str) -> User | None:
     """Look up a user by primary key."""
-    return db.query(User).filter(User.id == user_id).first()
+    return db.get(User, user_id)
 
 
 def get_user_by_email(db: Session, email: str) -> User | None:
@@ -316,7 +342,7 @@ def create_local_user(
 ) -> User:
     """Create a local (non-SSO) user account."""
     user = User(
-        id=str(uuid.uuid4()),
+        id=str(_uuid4()),
         email=email,
         display_name=display_name or email.split("@")[0],
         auth_provider="local",
@@ -430,16 +456,20 @@ def sync_group_memberships(db: Session, user: User, group_ids: list[str]) -> Non
 # ---------------------------------------------------------------------------
 
 
-def create_organization(db: Session, name: str, slug: str) -> Organization:
-    """Create a new organization."""
-    org = Organization(id=str(uuid.uuid4()), name=name, slug=slug)
+def create_organization(
+    db: Session, name: str, slug: str, *, id: str | None = None
+) -> Organization:
+    """Create a new organization; a UUID is generated unless *id* is given."""
+    org = Organization(id=id or str(_uuid4()), name=name, slug=slug)
     db.add(org)
     return org
 
 
-def create_team(db: Session, org_id: str, name: str, slug: str) -> Team:
-    """Create a new team within an organization."""
-    team = Team(id=str(uuid.uuid4()), org_id=org_id, name=name, slug=slug)
+def create_team(
+    db: Session, org_id: str, name: str, slug: str, *, id: str | None = None
+) -> Team:
+    """Create a new team within an organization; *id* defaults to a new UUID."""
+    team = Team(id=id or str(_uuid4()), org_id=org_id, name=name, slug=slug)
     db.add(team)
     return team
 
@@ -456,12 +486,12 @@ def list_organizations(db: Session, *, is_active: bool = True) -> list[Organizat
 
 def get_organization_by_id(db: Session, org_id: str) -> Organization | None:
     """Look up an organization by primary key."""
-    return db.query(Organization).filter(Organization.id == org_id).first()
+    return db.get(Organization, org_id)
 
 
 def update_organization(db: Session, org_id: str, **kwargs) -> Organization:
     """Update mutable fields on an organization."""
-    org = db.query(Organization).filter(Organization.id == org_id).one()
+    org = db.get_one(Organization, org_id)
     for key, value in kwargs.items():
         if hasattr(org, key) and key not in ("id", "created_at"):
             setattr(org, key, value)
@@ -470,7 +500,7 @@ def update_organization(db: Session, org_id: str, **kwargs) -> Organization:
 
 def deactivate_organization(db: Session, org_id: str) -> None:
     """Soft-delete an organization by setting is_active=False."""
-    org = db.query(Organization).filter(Organization.id == org_id).one()
+    org = db.get_one(Organization, org_id)
     org.is_active = False
 
 
@@ -479,19 +509,27 @@ def deactivate_organization(db: Session, org_id: str) -> None:
 # ---------------------------------------------------------------------------
 
 
-def list_teams(db: Session, org_id: str) -> list[Team]:
-    """List all teams within an organization."""
-    return db.query(Team).filter(Team.org_id == org_id).all()
+def list_teams(db: Session, org_id: str, *, with_members: bool = False) -> list[Team]:
+    """List all teams within an organization.
+
+    Relationships on the returned teams raise instead of lazy loading. With
+    ``with_members=True``, ``Team.members`` is loaded for every team in one
+    extra SELECT ... IN query.
+    """
+    query = db.query(Team).options(raiseload("*"))
+    if with_members:
+        query = query.options(selectinload(Team.members))
+    return query.filter(Team.org_id == org_id).all()
 
 
 def get_team_by_id(db: Session, team_id: str) -> Team | None:
     """Look up a team by primary key."""
-    return db.query(Team).filter(Team.id == team_id).first()
+    return db.get(Team, team_id)
 
 
 def update_team(db: Session, team_id: str, **kwargs) -> Team:
     """Update mutable fields on a team."""
-    team = db.query(Team).filter(Team.id == team_id).one()
+    team = db.get_one(Team, team_id)
     for key, value in kwargs.items():
         if hasattr(team, key) and key not in ("id", "org_id", "created_at"):
             setattr(team, key, value)
@@ -516,18 +554,33 @@ def list_users(
     team_id: str | None = None,
     is_active: bool = True,
 ) -> list[User]:
-    """List users, optionally filtered by org/team membership and active status."""
-    query = db.query(User).filter(User.is_active == is_active)
+    """List users, optionally filtered by org/team membership and active status.
+
+    Relationships on the returned users raise instead of lazy loading one
+    query per row; callers that need them must add their own loader options.
+    When filtering by org/team, the joined membership row populates
+    ``org_memberships``/``team_memberships`` from the same query, so those
+    collections hold only the filtered org's/team's membership.
+    """
+    query = db.query(User).options(raiseload("*")).filter(User.is_active == is_active)
     if org_id:
-        query = query.join(OrgMembership).filter(OrgMembership.org_id == org_id)
+        query = (
+            query.join(OrgMembership)
+            .filter(OrgMembership.org_id == org_id)
+            .options(contains_eager(User.org_memberships))
+        )
     if team_id:
-        query = query.join(TeamMembership).filter(TeamMembership.team_id == team_id)
+        query = (
+            query.join(TeamMembership)
+            .filter(TeamMembership.team_id == team_id)
+            .options(contains_eager(User.team_memberships))
+        )
     return query.all()
 
 
 def update_user(db: Session, user_id: str, **kwargs) -> User:
     """Update mutable fields on a user."""
-    user = db.query(User).filter(User.id == user_id).one()
+    user = db.get_one(User, user_id)
     for key, value in kwargs.items():
         if hasattr(user, key) and key not in ("id", "created_at", "password_hash"):
             setattr(user, key, value)
@@ -536,7 +589,7 @@ def update_user(db: Session, user_id: str, **kwargs) -> User:
 
 def deactivate_user(db: Session, user_id: str) -> None:
     """Soft-delete a user by setting is_active=False."""
-    user = db.query(User).filter(User.id == user_id).one()
+    user = db.get_one(User, user_id)
     user.is_active = False
 
 
@@ -571,7 +624,12 @@ def set_user_role(
 
 def list_group_mappings(db: Session, org_id: str) -> list[EntraGroupMapping]:
     """List EntraID group mappings for an organization."""
-    return db.query(EntraGroupMapping).filter(EntraGroupMapping.org_id == org_id).all()
+    return (
+        db.query(EntraGroupMapping)
+        .options(raiseload("*"))
+        .filter(EntraGroupMapping.org_id == org_id)
+        .all()
+    )
 
 
 def upsert_group_mapping(
@@ -643,8 +701,29 @@ def store_vault_key(
     key_name: str,
     plaintext_value: str,
 ) -> ApiKeyVault:
-    """Encrypt and store an API key in the vault (upsert)."""
+    """Encrypt and store an API key in the vault (upsert).
+
+    On SQLite and PostgreSQL this is a single ``INSERT ... ON CONFLICT DO
+    UPDATE ... RETURNING`` against the ``(owner_type, owner_id, key_name)``
+    unique constraint; other backends fall back to SELECT then write.
+    """
     encrypted = vault_crypto.encrypt(plaintext_value, purpose="api_key_vault")
+
+    dialect_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        stmt = dialect_insert(ApiKeyVault).values(
+            id=str(_uuid4()),
+            owner_type=owner_type,
+            owner_id=owner_id,
+            key_name=key_name,
+            encrypted_value=encrypted,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["owner_type", "owner_id", "key_name"],
+            set_={"encrypted_value": stmt.excluded.encrypted_value},
+        ).returning(ApiKeyVault)
+        return db.scalars(stmt, execution_options={"populate_existing": True}).one()
+
     existing = (
         db.query(ApiKeyVault)
         .filter_by(owner_type=owner_type, owner_id=owner_id, key_name=key_name)
@@ -654,7 +733,7 @@ def store_vault_key(
         existing.encrypted_value = encrypted
         return existing
     entry = ApiKeyVault(
-        id=str(uuid.uuid4()),
+        id=str(_uuid4()),
         owner_type=owner_type,
         owner_id=owner_id,
         key_name=key_name,
@@ -664,9 +743,33 @@ def store_vault_key(
     return entry
 
 
+def store_vault_keys_bulk(db: Session, entries: list[dict]) -> list[str]:
+    """Encrypt and insert several new API keys with one INSERT statement.
+
+    Each entry needs ``owner_type``, ``owner_id``, ``key_name`` and
+    ``plaintext_value``.  Unlike :func:`store_vault_key` this does not upsert:
+    the keys must not exist yet.  Returns the new vault ids in entry order.
+    """
+    rows = [
+        {
+            "id": str(_uuid4()),
+            "owner_type": e["owner_type"],
+            "owner_id": e["owner_id"],
+            "key_name": e["key_name"],
+            "encrypted_value": vault_crypto.encrypt(
+                e["plaintext_value"], purpose="api_key_vault"
+            ),
+        }
+        for e in entries
+    ]
+    if rows:
+        db.execute(insert(ApiKeyVault), rows)
+    return [row["id"] for row in rows]
+
+
 def get_vault_key_value(db: Session, vault_id: str) -> str:
     """Decrypt and return a vault key's plaintext value."""
-    entry = db.query(ApiKeyVault).filter(ApiKeyVault.id == vault_id).one()
+    entry = db.get_one(ApiKeyVault, vault_id)
     return vault_crypto.decrypt(entry.encrypted_value, purpose="api_key_vault")
 
 
@@ -682,20 +785,27 @@ def resolve_api_key(
     team_id: str,
     org_id: str,
 ) -> str | None:
-    """Resolve an API key by cascading: user → team → org → system."""
-    for owner_type, owner_id in [
+    """Resolve an API key by cascading: user → team → org → system.
+
+    All four levels are fetched in one query ordered by cascade priority.
+    """
+    owners = [
         ("user", user_id),
         ("team", team_id),
         ("org", org_id),
         ("system", "system"),
-    ]:
-        entry = (
-            db.query(ApiKeyVault)
-            .filter_by(owner_type=owner_type, owner_id=owner_id, key_name=key_name)
-            .first()
+    ]
+    entry = (
+        db.query(ApiKeyVault)
+        .filter(
+            ApiKeyVault.key_name == key_name,
+            tuple_(ApiKeyVault.owner_type, ApiKeyVault.owner_id).in_(owners),
         )
-        if entry:
-            return vault_crypto.decrypt(entry.encrypted_value, purpose="api_key_vault")
+        .order_by(case(_VAULT_OWNER_PRIORITY, value=ApiKeyVault.owner_type))
+        .first()
+    )
+    if entry:
+        return vault_crypto.decrypt(entry.encrypted_value, purpose="api_key_vault")
     return None
 
 
@@ -704,52 +814,89 @@ def resolve_api_key(
 # ---------------------------------------------------------------------------
 
 
-def list_services(db: Session, org_id: str | None = None) -> list[McpServiceRegistry]:
-    """List MCP services, optionally scoped to an org (None = system-wide only)."""
-    query = db.query(McpServiceRegistry).filter(McpServiceRegistry.is_enabled == True)  # noqa: E712
+def _enabled_services_in_scope(org_id: str | None) -> list:
+    """WHERE clauses for enabled services visible to *org_id*."""
+    clauses = [McpServiceRegistry.is_enabled == True]  # noqa: E712
     if org_id:
-        query = query.filter(
+        clauses.append(
             (McpServiceRegistry.org_id == org_id) | (McpServiceRegistry.org_id == None)  # noqa: E711
         )
     else:
-        query = query.filter(McpServiceRegistry.org_id == None)  # noqa: E711
-    return query.all()
+        clauses.append(McpServiceRegistry.org_id == None)  # noqa: E711
+    return clauses
+
+
+def list_services(db: Session, org_id: str | None = None) -> list[McpServiceRegistry]:
+    """List MCP services, optionally scoped to an org (None = system-wide only)."""
+    stmt = select(McpServiceRegistry).where(*_enabled_services_in_scope(org_id))
+    return list(db.scalars(stmt))
+
+
+# Registry columns safe to show in listings (everything but the client secret).
+_SERVICE_LISTING_COLUMNS = tuple(
+    c for c in McpServiceRegistry.__table__.c if c.name != "client_secret_encrypted"
+)
+
+
+def list_services_lite(db: Session, org_id: str | None = None) -> list[Row]:
+    """Like :func:`list_services`, but return plain column rows.
+
+    Skips ORM instance construction for read-only listings. Rows carry every
+    registry column except ``client_secret_encrypted`` and support attribute
+    access (``row.name``).
+    """
+    stmt = select(*_SERVICE_LISTING_COLUMNS).where(*_enabled_services_in_scope(org_id))
+    return list(db.execute(stmt))
 
 
 def get_service(db: Session, service_id: str) -> McpServiceRegistry | None:
     """Look up an MCP service by primary key."""
-    return (
-        db.query(McpServiceRegistry).filter(McpServiceRegistry.id == service_id).first()
-    )
+    return db.get(McpServiceRegistry, service_id)
 
 
-def create_service(db: Session, **kwargs) -> McpServiceRegistry:
-    """Create an MCP service registry entry."""
-    # Encrypt client_secret if provided
+def _service_columns(kwargs: dict) -> dict:
+    """Map service keyword arguments onto registry column values.
+
+    A plaintext ``client_secret`` is replaced by its encrypted column value,
+    and ``args_json``/``env_keys_json`` may be given as lists, which are
+    serialized here instead of by every caller.
+    """
+    for key in ("args_json", "env_keys_json"):
+        if isinstance(kwargs.get(key), (list, tuple)):
+            kwargs[key] = json.dumps(kwargs[key], separators=(",", ":"))
     if "client_secret" in kwargs:
         secret = kwargs.pop("client_secret")
         if secret:
             kwargs["client_secret_encrypted"] = vault_crypto.encrypt(
                 secret, purpose="mcp_service_credentials"
             )
-    service = McpServiceRegistry(id=str(uuid.uuid4()), **kwargs)
-    db.add(service)
-    return service
+    return kwargs
+
+
+def create_services_bulk(db: Session, rows: list[dict]) -> list[McpServiceRegistry]:
+    """Create several MCP service registry entries with a single flush.
+
+    Each row takes the same keyword arguments as :func:`create_service`.
+    Returns the new services in row order.
+    """
+    services = [
+        McpServiceRegistry(id=str(_uuid4()), **_service_columns(dict(row)))
+        for row in rows
+    ]
+    db.add_all(services)
+    db.flush()
+    return services
+
+
+def create_service(db: Session, **kwargs) -> McpServiceRegistry:
+    """Create an MCP service registry entry."""
+    return create_services_bulk(db, [kwargs])[0]
 
 
 def update_service(db: Session, service_id: str, **kwargs) -> McpServiceRegistry:
     """Update an MCP service registry entry."""
-    service = (
-        db.query(McpServiceRegistry).filter(McpServiceRegistry.id == service_id).one()
-    )
-    # Handle client_secret encryption
-    if "client_secret" in kwargs:
-        secret = kwargs.pop("client_secret")
-        if secret:
-            kwargs["client_secret_encrypted"] = vault_crypto.encrypt(
-                secret, purpose="mcp_service_credentials"
-            )
-    for key, value in kwargs.items():
+    service = db.get_one(McpServiceRegistry, service_id)
+    for key, value in _service_columns(kwargs).items():
         if hasattr(service, key) and key not in ("id", "created_at"):
             setattr(service, key, value)
     return service
@@ -775,15 +922,60 @@ def get_connection(db: Session, user_id: str, service_id: str) -> McpConnection
     )
 
 
-def list_connections(db: Session, user_id: str) -> list[McpConnection]:
-    """List all MCP connections for a user."""
-    return db.query(McpConnection).filter(McpConnection.user_id == user_id).all()
+def list_connections(
+    db: Session, user_id: str, *, with_service: bool = False
+) -> list[McpConnection]:
+    """List all MCP connections for a user.
+
+    With ``with_service=True``, ``McpConnection.service`` is loaded for every
+    connection in one extra SELECT ... IN query.
+    """
+    stmt = select(McpConnection).where(McpConnection.user_id == user_id)
+    if with_service:
+        stmt = stmt.options(selectinload(McpConnection.service))
+    return list(db.scalars(stmt))
+
+
+def list_connection_ids(db: Session, user_id: str) -> list[str]:
+    """Return the service ids a user is connected to, without loading rows."""
+    return list(
+        db.scalars(
+            select(McpConnection.service_id).where(McpConnection.user_id == user_id)
+        )
+    )
 
 
 def upsert_connection(
     db: Session, user_id: str, service_id: str, **kwargs
 ) -> McpConnection:
-    """Create or update an MCP connection."""
+    """Create or update an MCP connection.
+
+    On SQLite and PostgreSQL this is a single ``INSERT ... ON CONFLICT DO
+    UPDATE ... RETURNING`` against the ``(user_id, service_id)`` unique
+    constraint, updating only the given columns; other backends fall back to
+    SELECT then write.
+    """
+    dialect_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is not None:
+        columns = McpConnection.__table__.c
+        values = {
+            key: value
+            for key, value in kwargs.items()
+            if key in columns and key not in ("id", "user_id", "service_id")
+        }
+        stmt = dialect_insert(McpConnection).values(
+            id=str(_uuid4()), user_id=user_id, service_id=service_id, **values
+        )
+        # ON CONFLICT DO UPDATE needs at least one column; a self-assignment
+        # keeps RETURNING working when only the row itself is wanted.
+        set_ = {key: stmt.excluded[key] for key in values} or {
+            "user_id": stmt.excluded.user_id
+        }
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "service_id"], set_=set_
+        ).returning(McpConnection)
+        return db.scalars(stmt, execution_options={"populate_existing": True}).one()
+
     conn = get_connection(db, user_id, service_id)
     if conn:
         for key, value in kwargs.items():
@@ -791,7 +983,7 @@ def upsert_connection(
                 setattr(conn, key, value)
     else:
         conn = McpConnection(
-            id=str(uuid.uuid4()),
+            id=str(_uuid4()),
             user_id=user_id,
             service_id=service_id,
             **kwargs,
@@ -804,14 +996,18 @@ def delete_connection(db: Session, user_id: str, service_id: str) -> None:
     """Delete an MCP connection (also removes associated vault entries)."""
     conn = get_connection(db, user_id, service_id)
     if conn:
-        # Clean up vault entries
-        for vault_id in [
-            conn.access_token_vault_id,
-            conn.refresh_token_vault_id,
-            conn.client_info_vault_id,
-        ]:
-            if vault_id:
-                db.query(ApiKeyVault).filter(ApiKeyVault.id == vault_id).delete()
+        # Clean up vault entries with one DELETE
+        vault_ids = [
+            vault_id
+            for vault_id in (
+                conn.access_token_vault_id,
+                conn.refresh_token_vault_id,
+                conn.client_info_vault_id,
+            )
+            if vault_id
+        ]
+        if vault_ids:
+            db.query(ApiKeyVault).filter(ApiKeyVault.id.in_(vault_ids)).delete()
         db.query(McpConnection).filter(McpConnection.id == conn.id).delete()
 
 
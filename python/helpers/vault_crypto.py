@@ -22,6 +22,7 @@ Key rotation workflow:
 import base64
 import os
 import secrets
+from functools import lru_cache
 
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.ciphers.aead import AESGCM
@@ -75,13 +76,34 @@ def _derive_key(purpose: str) -> bytes:
     Returns:
         32-byte derived key suitable for AES-256-GCM.
     """
+    return _hkdf_derive(_get_master_key(), purpose)
+
+
+@lru_cache(maxsize=32)
+def _hkdf_derive(master_key: bytes, purpose: str) -> bytes:
+    """Run HKDF once per (master key, purpose); every vault read/write needs it."""
     hkdf = HKDF(
         algorithm=hashes.SHA256(),
         length=32,
         salt=None,
         info=purpose.encode(),
     )
-    return hkdf.derive(_get_master_key())
+    return hkdf.derive(master_key)
+
+
+def _cipher_for_purpose(purpose: str) -> AESGCM:
+    """Return the AES-256-GCM cipher for *purpose* under the current master key."""
+    return _aesgcm(_derive_key(purpose))
+
+
+@lru_cache(maxsize=32)
+def _aesgcm(key: bytes) -> AESGCM:
+    """Build one cipher per derived key.
+
+    Keyed by the key bytes, so a master-key change yields a fresh cipher
+    without explicit invalidation. ``AESGCM`` keeps no per-call state.
+    """
+    return AESGCM(key)
 
 
 def encrypt(plaintext: str, purpose: str = "api_key_vault") -> str:
@@ -98,9 +120,8 @@ def encrypt(plaintext: str, purpose: str = "api_key_vault") -> str:
     Returns:
         Base64-encoded string of ``nonce (12 bytes) || ciphertext+tag``.
     """
-    key = _derive_key(purpose)
     nonce = secrets.token_bytes(12)
-    ciphertext = AESGCM(key).encrypt(nonce, plaintext.encode(), None)
+    ciphertext = _cipher_for_purpose(purpose).encrypt(nonce, plaintext.encode(), None)
     return base64.b64encode(nonce + ciphertext).decode("ascii")
 
 
@@ -119,8 +140,7 @@ def decrypt(encrypted: str, purpose: str = "api_key_vault") -> str:
             the data has been tampered with.
         ValueError: If *encrypted* is not valid Base64.
     """
-    key = _derive_key(purpose)
     raw = base64.b64decode(encrypted)
     nonce = raw[:12]
     ciphertext = raw[12:]
-    return AESGCM(key).decrypt(nonce, ciphertext, None).decode()
+    return _cipher_for_purpose(purpose).decrypt(nonce, ciphertext, None).decode()
@@ -1,37 +1,202 @@
 """Shared pytest fixtures for the test suite.
 
-Provides common fixtures (db_session, _reset_vault_master_key) used across
-multiple test modules, eliminating duplication.
+Provides common fixtures (db_engine, db_session, auth_db_wired, test_org,
+test_user, rbac_enforcer, mcp_auth_ctx, _reset_vault_master_key) used across
+multiple test modules, eliminating duplication, and makes password hashing
+cheap for the whole session.
 """
 
+import uuid
+from types import SimpleNamespace
+
 import pytest
-from sqlalchemy import create_engine
+from argon2 import PasswordHasher
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from python.helpers.auth_db import Base
 
 
-@pytest.fixture
-def db_session():
-    """Provide an in-memory SQLite session with all auth tables created."""
+def _set_sqlite_test_pragmas(dbapi_connection, _connection_record):
+    """Disable durability work the throwaway test database never needs."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+@pytest.fixture(scope="session")
+def _auth_engine():
+    """One in-memory SQLite engine with all auth tables, created once per run.
+
+    ``StaticPool`` keeps the single connection (and therefore the database)
+    alive for the whole session and lets helper threads share it. Under
+    pytest-xdist each worker process gets its own session, so every worker
+    has a private database.
+    """
     import python.helpers.audit  # noqa: F401 — register AuditLog on Base
     import python.helpers.user_store  # noqa: F401 — ensure models register on Base
 
-    engine = create_engine("sqlite:///:memory:", echo=False)
-    Base.metadata.create_all(engine)
-    _Session = sessionmaker(bind=engine)
-    session = _Session()
+    engine = create_engine(
+        "sqlite://",
+        echo=False,
+        poolclass=StaticPool,
+        pool_reset_on_return=None,
+        # Room for every distinct ORM statement the suite compiles, so the
+        # shared engine never evicts and recompiles them between tests.
+        query_cache_size=1200,
+        connect_args={"check_same_thread": False},
+    )
+    event.listen(engine, "connect", _set_sqlite_test_pragmas)
+    # The database is brand new, so skip the per-table existence probes.
+    Base.metadata.create_all(engine, checkfirst=False)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_engine(_auth_engine):
+    """Provide the shared in-memory engine, emptied of rows after each test.
+
+    Deleting rows is much cheaper than replaying DDL, and also clears tables
+    created outside ``Base`` (e.g. the Casbin adapter's ``casbin_rule``).
+    """
+    yield _auth_engine
+
+    with _auth_engine.begin() as conn:
+        for table_name in inspect(conn).get_table_names():
+            conn.exec_driver_sql(f'DELETE FROM "{table_name}"')
+
+
+@pytest.fixture(scope="session")
+def _auth_sessionmaker(_auth_engine):
+    """Session factory for the shared engine, built once per run.
+
+    Keeps the default expire-on-commit: ``auth_db``, the Casbin adapter and
+    the audit writer commit through their own sessions on the same pooled
+    connection, so attributes must be reloaded after ``commit()``.
+    Autoflush stays on: tests rely on it instead of explicit ``flush()``.
+    """
+    return sessionmaker(bind=_auth_engine)
+
+
+@pytest.fixture
+def db_session(db_engine, _auth_sessionmaker):
+    """Provide a session on the shared in-memory engine."""
+    session = _auth_sessionmaker()
 
     yield session
 
     session.close()
-    Base.metadata.drop_all(engine)
-    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def _auth_db_sessionmaker(_auth_engine):
+    """Factory handed to ``auth_db``, built once with production defaults.
+
+    Unlike ``_auth_sessionmaker`` it keeps ``expire_on_commit=True``, so code
+    under test sees the same post-commit behaviour as ``auth_db.init_db()``.
+    """
+    return sessionmaker(bind=_auth_engine)
+
+
+@pytest.fixture
+def auth_db_wired(db_session, _auth_engine, _auth_db_sessionmaker, monkeypatch):
+    """Point ``auth_db`` at the test engine so ``get_session()`` works.
+
+    Yields ``db_session`` for tests that also read/write directly.
+    """
+    from python.helpers import auth_db
+
+    monkeypatch.setattr(auth_db, "_engine", _auth_engine)
+    monkeypatch.setattr(auth_db, "_SessionLocal", _auth_db_sessionmaker)
+    yield db_session
+
+
+@pytest.fixture
+def test_org(db_session):
+    """Create and return a test organization."""
+    from python.helpers.user_store import create_organization
+
+    org = create_organization(db_session, name="Test Org", slug="test-org")
+    db_session.flush()
+    return org
+
+
+@pytest.fixture
+def test_user(db_session):
+    """Create and return a test user."""
+    from python.helpers.user_store import User
+
+    user = User(
+        id=str(uuid.uuid4()),
+        email="mcpuser@example.com",
+        display_name="MCP User",
+        auth_provider="local",
+    )
+    db_session.add(user)
+    db_session.flush()
+    return user
+
+
+@pytest.fixture(scope="module")
+def _rbac_model_enforcer():
+    """Adapter-less Casbin enforcer; the RBAC model is parsed once per module."""
+    import casbin
+
+    from python.helpers.files import get_abs_path
+
+    return casbin.Enforcer(get_abs_path("conf/rbac_model.conf"))
+
+
+@pytest.fixture
+def rbac_enforcer(_rbac_model_enforcer):
+    """Provide the module's enforcer with no policies left over from other tests."""
+    yield _rbac_model_enforcer
+    _rbac_model_enforcer.clear_policy()
+
+
+def _mcp_auth_ctx(*, bearer: bool = True, **token_fields) -> SimpleNamespace:
+    """Minimal ``AuthContext`` stand-in; ``bearer=False`` means token-in-path."""
+    if not bearer:
+        return SimpleNamespace(token=None)
+    token = SimpleNamespace(**{"scopes": [], "claims": {}, **token_fields})
+    return SimpleNamespace(token=token)
+
+
+@pytest.fixture
+def mcp_auth_ctx():
+    """Factory for MCP auth-check contexts, e.g. ``mcp_auth_ctx(scopes=[...])``."""
+    return _mcp_auth_ctx
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _cheap_password_hashing():
+    """Hash test passwords with the cheapest Argon2id parameters.
+
+    Hashes keep the ``$argon2id$`` format and still verify, but skip the
+    production memory/time cost that otherwise dominates user-creation tests.
+    """
+    from python.helpers import user_store
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(
+            user_store,
+            "_ph",
+            PasswordHasher(time_cost=1, memory_cost=8, parallelism=1),
+        )
+        yield
 
 
 @pytest.fixture
 def _reset_vault_master_key(monkeypatch):
-    """Set a test VAULT_MASTER_KEY and reset the cached key between tests."""
+    """Set a test VAULT_MASTER_KEY and reset the cached key between tests.
+
+    Resetting is cheap: HKDF subkeys are memoized per master key inside
+    ``vault_crypto``, so tests sharing this key reuse the derivations.
+    """
     from python.helpers import vault_crypto
 
     monkeypatch.setenv("VAULT_MASTER_KEY", "a" * 64)
@@ -14,6 +14,7 @@ import pytest
 from cryptography.exceptions import InvalidTag
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 pytestmark = pytest.mark.usefixtures("_reset_vault_master_key")
 
@@ -41,6 +42,9 @@ class TestAuthDb:
 
             assert auth_db._engine is not None
             assert auth_db._SessionLocal is not None
+            # In-memory SQLite must share one connection across threads
+            assert isinstance(auth_db._engine.pool, StaticPool)
+            auth_db._engine.dispose()
         finally:
             auth_db._engine = original_engine
             auth_db._SessionLocal = original_session
@@ -178,6 +182,21 @@ class TestVaultCrypto:
         ct2 = encrypt(plaintext, purpose="api_key_vault")
         assert ct1 != ct2
 
+    def test_derived_key_follows_master_key(self, monkeypatch):
+        """Memoized subkeys/ciphers must be rebuilt when the master key changes."""
+        from python.helpers import vault_crypto
+
+        key_a = vault_crypto._derive_key("api_key_vault")
+        assert vault_crypto._derive_key("api_key_vault") is key_a
+
+        cipher_a = vault_crypto._cipher_for_purpose("api_key_vault")
+        assert vault_crypto._cipher_for_purpose("api_key_vault") is cipher_a
+
+        monkeypatch.setenv("VAULT_MASTER_KEY", "b" * 64)
+        vault_crypto._master_key = None
+        assert vault_crypto._derive_key("api_key_vault") != key_a
+        assert vault_crypto._cipher_for_purpose("api_key_vault") is not cipher_a
+
     def test_missing_master_key_raises(self, monkeypatch):
         """With VAULT_MASTER_KEY unset, encrypt must raise RuntimeError."""
         from python.helpers import vault_crypto
@@ -475,28 +494,7 @@ class TestUserStoreModels:
 class TestAuthBootstrap:
     """Tests for python.helpers.auth_bootstrap (idempotent seeding)."""
 
-    @pytest.fixture
-    def _bootstrap_db(self, db_session: Session):
-        """Wire auth_db module to use the in-memory test engine so that
-        get_session() works during bootstrap, and stub out Alembic migrations.
-        """
-        from python.helpers import auth_db
-
-        engine = db_session.get_bind()
-        _Session = sessionmaker(bind=engine)
-
-        original_engine = auth_db._engine
-        original_session_local = auth_db._SessionLocal
-
-        auth_db._engine = engine
-        auth_db._SessionLocal = _Session
-
-        yield db_session
-
-        auth_db._engine = original_engine
-        auth_db._SessionLocal = original_session_local
-
-    def test_bootstrap_creates_default_org_and_team(self, _bootstrap_db, monkeypatch):
+    def test_bootstrap_creates_default_org_and_team(self, auth_db_wired, monkeypatch):
         """After _seed_defaults(), the default org and team must exist."""
         from python.helpers.auth_bootstrap import _seed_defaults
         from python.helpers.user_store import Organization, Team
@@ -507,7 +505,7 @@ class TestAuthBootstrap:
 
         _seed_defaults()
 
-        session = _bootstrap_db
+        session = auth_db_wired
         org = session.query(Organization).filter_by(slug="default").first()
         assert org is not None
         assert org.name == "Default Org"
@@ -517,7 +515,7 @@ class TestAuthBootstrap:
         assert team.name == "Default Team"
 
     def test_bootstrap_creates_admin_when_env_vars_set(
-        self, _bootstrap_db, monkeypatch
+        self, auth_db_wired, monkeypatch
     ):
         """With ADMIN_EMAIL + ADMIN_PASSWORD, an admin user is created with
         is_system_admin=True, org owner membership, and team lead membership.
@@ -534,7 +532,7 @@ class TestAuthBootstrap:
 
         _seed_defaults()
 
-        session = _bootstrap_db
+        session = auth_db_wired
         admin = session.query(User).filter_by(email="admin@test.com").first()
         assert admin is not None
         assert admin.is_system_admin is True
@@ -552,7 +550,7 @@ class TestAuthBootstrap:
         assert team_mem is not None
         assert team_mem.role == "lead"
 
-    def test_bootstrap_idempotent(self, _bootstrap_db, monkeypatch):
+    def test_bootstrap_idempotent(self, auth_db_wired, monkeypatch):
         """Calling _seed_defaults() twice must not create duplicate orgs."""
         from python.helpers.auth_bootstrap import _seed_defaults
         from python.helpers.user_store import Organization
@@ -563,11 +561,11 @@ class TestAuthBootstrap:
         _seed_defaults()
         _seed_defaults()  # second call should be a no-op
 
-        session = _bootstrap_db
+        session = auth_db_wired
         orgs = session.query(Organization).all()
         assert len(orgs) == 1
 
-    def test_bootstrap_skips_admin_without_password(self, _bootstrap_db, monkeypatch):
+    def test_bootstrap_skips_admin_without_password(self, auth_db_wired, monkeypatch):
         """ADMIN_EMAIL without ADMIN_PASSWORD must NOT create an admin user."""
         from python.helpers.auth_bootstrap import _seed_defaults
         from python.helpers.user_store import User
@@ -577,7 +575,7 @@ class TestAuthBootstrap:
 
         _seed_defaults()
 
-        session = _bootstrap_db
+        session = auth_db_wired
         admin = session.query(User).filter_by(email="noadmin@test.com").first()
         assert admin is None
 
@@ -611,33 +609,14 @@ class TestGroupMappingBootstrap:
     """Tests for _seed_group_mappings() env-var-based group mapping seeding."""
 
     @pytest.fixture
-    def _bootstrap_db(self, db_session: Session):
-        """Wire auth_db module to use the in-memory test engine."""
-        from python.helpers import auth_db
-
-        engine = db_session.get_bind()
-        _Session = sessionmaker(bind=engine)
-
-        original_engine = auth_db._engine
-        original_session_local = auth_db._SessionLocal
-
-        auth_db._engine = engine
-        auth_db._SessionLocal = _Session
-
-        yield db_session
-
-        auth_db._engine = original_engine
-        auth_db._SessionLocal = original_session_local
-
-    @pytest.fixture
-    def seeded_db(self, _bootstrap_db, monkeypatch):
+    def seeded_db(self, auth_db_wired, monkeypatch):
         """Seed default org and team, then return the session."""
         from python.helpers.auth_bootstrap import _seed_defaults
 
         monkeypatch.delenv("ADMIN_EMAIL", raising=False)
         monkeypatch.delenv("ADMIN_PASSWORD", raising=False)
         _seed_defaults()
-        return _bootstrap_db
+        return auth_db_wired
 
     def test_no_env_var_is_noop(self, seeded_db, monkeypatch):
         """Without A0_SET_SSO_GROUP_MAPPINGS, no mappings are created."""
@@ -14,31 +14,10 @@ from unittest.mock import MagicMock, Mock, patch
 
 import pytest
 from flask import Flask, Response, g, session
-from sqlalchemy.orm import Session, sessionmaker
 
 pytestmark = pytest.mark.usefixtures("_reset_vault_master_key")
 
 
-@pytest.fixture
-def auth_db_wired(db_session: Session):
-    """Wire auth_db module to use the in-memory test engine."""
-    from python.helpers import auth_db
-
-    engine = db_session.get_bind()
-    _Session = sessionmaker(bind=engine)
-
-    original_engine = auth_db._engine
-    original_session_local = auth_db._SessionLocal
-
-    auth_db._engine = engine
-    auth_db._SessionLocal = _Session
-
-    yield db_session
-
-    auth_db._engine = original_engine
-    auth_db._SessionLocal = original_session_local
-
-
 @pytest.fixture
 def mock_files(tmp_path, monkeypatch):
     """Mock files.get_abs_path and files.read_file/write_file to use tmp_path."""
@@ -7,13 +7,60 @@ Covers: TenantContext (path resolution, factory methods), AgentContext
 isolation (user-level secrets cascade), and multiuser migration.
 """
 
-import json
 import os
 from unittest.mock import MagicMock, patch
 
 import pytest
 
 
+# ---------------------------------------------------------------------------
+# Shared fixtures
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture(scope="session")
+def mock_config():
+    """AgentConfig with opaque placeholder models (never called in these tests)."""
+    from agent import AgentConfig
+
+    return AgentConfig(
+        chat_model=object(),
+        utility_model=object(),
+        embeddings_model=object(),
+        browser_model=object(),
+        mcp_servers="{}",
+    )
+
+
+@pytest.fixture(scope="class")
+def _clean_contexts():
+    """Start and finish each context-touching class with an empty registry."""
+    from agent import AgentContext
+
+    with AgentContext._contexts_lock:
+        AgentContext._contexts.clear()
+    yield
+    with AgentContext._contexts_lock:
+        AgentContext._contexts.clear()
+
+
+@pytest.fixture
+def make_context():
+    """Create AgentContexts and remove only the ones this test created."""
+    from agent import AgentContext
+
+    created: list[str] = []
+
+    def _make(**kwargs):
+        ctx = AgentContext(**kwargs)
+        created.append(ctx.id)
+        return ctx
+
+    yield _make
+    for ctxid in created:
+        AgentContext.remove(ctxid)
+
+
 # ---------------------------------------------------------------------------
 # TenantContext Tests
 # ---------------------------------------------------------------------------
@@ -109,92 +156,52 @@ class TestTenantContext:
         with pytest.raises(AttributeError):
             ctx.user_id = "xyz"  # type: ignore[misc]
 
-    def test_ensure_dirs(self, tmp_path):
-        from python.helpers.tenant import TenantContext
-
-        ctx = TenantContext(user_id="test-user")
-        with patch(
-            "python.helpers.tenant.files.get_abs_path",
-            side_effect=lambda *p: str(tmp_path / "/".join(p)),
-        ):
-            ctx.ensure_dirs()
-            assert os.path.isdir(str(tmp_path / ctx.chats_dir))
-            assert os.path.isdir(str(tmp_path / ctx.uploads_dir))
-
 
 # ---------------------------------------------------------------------------
 # AgentContext User Filtering Tests
 # ---------------------------------------------------------------------------
 
 
+@pytest.mark.usefixtures("_clean_contexts")
 class TestAgentContextUserFiltering:
     """Test user_id and tenant_ctx on AgentContext."""
 
-    @pytest.fixture(autouse=True)
-    def _clean_contexts(self):
-        """Clear all contexts before and after each test."""
-        from agent import AgentContext
-
-        with AgentContext._contexts_lock:
-            AgentContext._contexts.clear()
-        yield
-        with AgentContext._contexts_lock:
-            AgentContext._contexts.clear()
-
-    @pytest.fixture
-    def mock_config(self):
-        from agent import AgentConfig
-
-        return AgentConfig(
-            chat_model=MagicMock(),
-            utility_model=MagicMock(),
-            embeddings_model=MagicMock(),
-            browser_model=MagicMock(),
-            mcp_servers="{}",
-        )
-
-    def test_context_stores_user_id(self, mock_config):
-        from agent import AgentContext
-
-        ctx = AgentContext(config=mock_config, user_id="user-1")
+    def test_context_stores_user_id(self, mock_config, make_context):
+        ctx = make_context(config=mock_config, user_id="user-1")
         assert ctx.user_id == "user-1"
 
-    def test_context_stores_tenant_ctx(self, mock_config):
+    def test_context_stores_tenant_ctx(self, mock_config, make_context):
         from python.helpers.tenant import TenantContext
 
-        from agent import AgentContext
-
         tenant = TenantContext(user_id="user-1")
-        ctx = AgentContext(config=mock_config, user_id="user-1", tenant_ctx=tenant)
+        ctx = make_context(config=mock_config, user_id="user-1", tenant_ctx=tenant)
         assert ctx.tenant_ctx is tenant
 
-    def test_first_for_user(self, mock_config):
+    def test_first_for_user(self, mock_config, make_context):
         from agent import AgentContext
 
-        ctx1 = AgentContext(config=mock_config, user_id="user-a")
-        _ctx2 = AgentContext(config=mock_config, user_id="user-b")
+        ctx1 = make_context(config=mock_config, user_id="user-a")
+        _ctx2 = make_context(config=mock_config, user_id="user-b")
         result = AgentContext.first_for_user("user-a")
         assert result is ctx1
 
-    def test_first_for_user_none(self, mock_config):
+    def test_first_for_user_none(self, mock_config, make_context):
         from agent import AgentContext
 
-        _ctx = AgentContext(config=mock_config, user_id="user-a")
+        _ctx = make_context(config=mock_config, user_id="user-a")
         assert AgentContext.first_for_user("user-z") is None
 
-    def test_all_for_user(self, mock_config):
+    def test_all_for_user(self, mock_config, make_context):
         from agent import AgentContext
 
-        ctx1 = AgentContext(config=mock_config, user_id="user-a")
-        _ctx2 = AgentContext(config=mock_config, user_id="user-b")
-        ctx3 = AgentContext(config=mock_config, user_id="user-a")
+        ctx1 = make_context(config=mock_config, user_id="user-a")
+        _ctx2 = make_context(config=mock_config, user_id="user-b")
+        ctx3 = make_context(config=mock_config, user_id="user-a")
         result = AgentContext.all_for_user("user-a")
-        assert set(c.id for c in result) == {ctx1.id, ctx3.id}
+        assert {c.id for c in result} == {ctx1.id, ctx3.id}
 
-    def test_output_includes_user_id(self, mock_config):
-        from agent import AgentContext
-
-        ctx = AgentContext(config=mock_config, user_id="user-1")
+    def test_output_includes_user_id(self, mock_config, make_context):
+        ctx = make_context(config=mock_config, user_id="user-1")
         out = ctx.output()
         assert out["user_id"] == "user-1"
 
@@ -204,19 +211,10 @@ class TestAgentContextUserFiltering:
 # ---------------------------------------------------------------------------
 
 
+@pytest.mark.usefixtures("_clean_contexts")
 class TestPersistChatSerialization:
     """Test user_id round-trip through serialize/deserialize."""
 
-    @pytest.fixture(autouse=True)
-    def _clean_contexts(self):
-        from agent import AgentContext
-
-        with AgentContext._contexts_lock:
-            AgentContext._contexts.clear()
-        yield
-        with AgentContext._contexts_lock:
-            AgentContext._contexts.clear()
-
     @staticmethod
     def _stub_agent_init(self, number=0, config=None, context=None):
         """Minimal Agent.__init__ that sets required attributes without side effects."""
@@ -230,27 +228,20 @@ class TestPersistChatSerialization:
         self.intervention = None
         self.data = {}
 
-    def test_serialize_includes_user_id(self):
-        from agent import Agent, AgentConfig, AgentContext
+    def test_serialize_includes_user_id(self, mock_config, make_context):
+        from agent import Agent
 
         from python.helpers.persist_chat import _serialize_context
         from python.helpers.tenant import TenantContext
 
-        config = AgentConfig(
-            chat_model=MagicMock(),
-            utility_model=MagicMock(),
-            embeddings_model=MagicMock(),
-            browser_model=MagicMock(),
-            mcp_servers="{}",
-        )
         tenant = TenantContext(user_id="user-42")
         with patch.object(Agent, "__init__", self._stub_agent_init):
-            ctx = AgentContext(config=config, user_id="user-42", tenant_ctx=tenant)
+            ctx = make_context(config=mock_config, user_id="user-42", tenant_ctx=tenant)
         data = _serialize_context(ctx)
         assert data["user_id"] == "user-42"
 
-    def test_deserialize_restores_user_id(self):
-        from agent import Agent, AgentConfig, AgentContext
+    def test_deserialize_restores_user_id(self, mock_config, make_context):
+        from agent import Agent
 
         from python.helpers.persist_chat import (
             _deserialize_context,
@@ -258,19 +249,14 @@ class TestPersistChatSerialization:
         )
         from python.helpers.tenant import TenantContext
 
-        config = AgentConfig(
-            chat_model=MagicMock(),
-            utility_model=MagicMock(),
-            embeddings_model=MagicMock(),
-            browser_model=MagicMock(),
-            mcp_servers="{}",
-        )
         tenant = TenantContext(user_id="user-42")
         with patch.object(Agent, "__init__", self._stub_agent_init):
-            original = AgentContext(config=config, user_id="user-42", tenant_ctx=tenant)
+            original = make_context(
+                config=mock_config, user_id="user-42", tenant_ctx=tenant
+            )
             data = _serialize_context(original)
             with patch(
-                "python.helpers.persist_chat.initialize_agent", return_value=config
+                "python.helpers.persist_chat.initialize_agent", return_value=mock_config
             ):
                 restored = _deserialize_context(data)
         assert restored.user_id == "user-42"
@@ -278,6 +264,73 @@ class TestPersistChatSerialization:
         assert restored.tenant_ctx.user_id == "user-42"
 
 
+# ---------------------------------------------------------------------------
+# Chat Path Resolution Tests
+# ---------------------------------------------------------------------------
+
+
+class TestChatPathResolution:
+    """Test user-scoped chat path resolution."""
+
+    def test_get_chats_folder_system(self, mock_config):
+        from agent import AgentContext
+
+        from python.helpers.persist_chat import _get_chats_folder
+        from python.helpers.tenant import TenantContext
+
+        system = TenantContext.system()
+        ctx = AgentContext(config=mock_config, tenant_ctx=system)
+        result = _get_chats_folder(ctx)
+        assert result == "usr/chats"
+
+        # Clean up
+        from agent import AgentContext as AC
+
+        with AC._contexts_lock:
+            AC._contexts.pop(ctx.id, None)
+
+    def test_get_chats_folder_user(self, mock_config):
+        from agent import AgentContext
+
+        from python.helpers.persist_chat import _get_chats_folder
+        from python.helpers.tenant import TenantContext
+
+        tenant = TenantContext(user_id="user-x")
+        ctx = AgentContext(config=mock_config, user_id="user-x", tenant_ctx=tenant)
+        result = _get_chats_folder(ctx)
+        assert result == "usr/orgs/default/teams/default/members/user-x/chats"
+        # Path is computed once per TenantContext and reused
+        assert _get_chats_folder(ctx) is result
+
+        # Clean up
+        from agent import AgentContext as AC
+
+        with AC._contexts_lock:
+            AC._contexts.pop(ctx.id, None)
+
+
+# ---------------------------------------------------------------------------
+# Tenant Directory Tests
+# ---------------------------------------------------------------------------
+
+
+class TestTenantDirectories:
+    """Test on-disk creation of the tenant directory tree."""
+
+    def test_ensure_dirs(self, tmp_path, monkeypatch):
+        from python.helpers.tenant import TenantContext
+
+        def _fake_abs(*p):
+            return str(tmp_path.joinpath(*p))
+
+        monkeypatch.setattr("python.helpers.tenant.files.get_abs_path", _fake_abs)
+
+        ctx = TenantContext(user_id="test-user")
+        ctx.ensure_dirs()
+        assert os.path.isdir(str(tmp_path / ctx.chats_dir))
+        assert os.path.isdir(str(tmp_path / ctx.uploads_dir))
+
+
 # ---------------------------------------------------------------------------
 # Memory Path Isolation Tests
 # ---------------------------------------------------------------------------
@@ -312,21 +365,14 @@ class TestMemoryIsolation:
                 path = memory.abs_db_dir("projects/myproj")
                 assert "memory" in path
 
-    def test_get_context_memory_subdir_with_tenant(self):
-        from agent import AgentConfig, AgentContext
+    def test_get_context_memory_subdir_with_tenant(self, mock_config):
+        from agent import AgentContext
 
         from python.helpers import memory
         from python.helpers.tenant import TenantContext
 
-        config = AgentConfig(
-            chat_model=MagicMock(),
-            utility_model=MagicMock(),
-            embeddings_model=MagicMock(),
-            browser_model=MagicMock(),
-            mcp_servers="{}",
-        )
         tenant = TenantContext(user_id="user-99")
-        ctx = AgentContext(config=config, user_id="user-99", tenant_ctx=tenant)
+        ctx = AgentContext(config=mock_config, user_id="user-99", tenant_ctx=tenant)
 
         with patch(
             "python.helpers.projects.get_context_memory_subdir", return_value=None
@@ -349,23 +395,29 @@ class TestMemoryIsolation:
 class TestSettingsIsolation:
     """Test tenant-aware settings cascade."""
 
-    def test_get_settings_for_tenant_system(self):
+    @pytest.fixture(scope="class")
+    def global_settings(self):
+        """Snapshot the global settings once for all comparisons in this class."""
+        from python.helpers import settings
+
+        return settings.get_settings()
+
+    def test_get_settings_for_tenant_system(self, global_settings):
         from python.helpers import settings
         from python.helpers.tenant import TenantContext
 
         system = TenantContext.system()
         result = settings.get_settings_for_tenant(system)
         # Should be identical to global settings
-        assert result == settings.get_settings()
+        assert result == global_settings
 
-    def test_get_settings_for_tenant_user_no_file(self, tmp_path):
+    def test_get_settings_for_tenant_user_no_file(self, global_settings):
         from python.helpers import settings
         from python.helpers.tenant import TenantContext
 
         tenant = TenantContext(user_id="no-file-user")
         # When user settings file doesn't exist, should fall back to global
         result = settings.get_settings_for_tenant(tenant)
-        global_settings = settings.get_settings()
         assert result["chat_model_provider"] == global_settings["chat_model_provider"]
 
 
@@ -406,7 +458,7 @@ class TestMultiuserMigration:
         ):
             _migrate_global_settings()
             assert dst.exists()
-            assert json.loads(dst.read_text())["version"] == "test"
+            assert b'"version": "test"' in dst.read_bytes()
 
     def test_migrate_global_settings_idempotent(self, tmp_path):
         """Should not overwrite existing global settings."""
@@ -425,61 +477,4 @@ class TestMultiuserMigration:
         ):
             _migrate_global_settings()
             # Should keep existing, not overwrite
-            assert json.loads(dst.read_text())["version"] == "existing"
-
-
-# ---------------------------------------------------------------------------
-# Chat Path Resolution Tests
-# ---------------------------------------------------------------------------
-
-
-class TestChatPathResolution:
-    """Test user-scoped chat path resolution."""
-
-    def test_get_chats_folder_system(self):
-        from agent import AgentConfig, AgentContext
-
-        from python.helpers.persist_chat import _get_chats_folder
-        from python.helpers.tenant import TenantContext
-
-        config = AgentConfig(
-            chat_model=MagicMock(),
-            utility_model=MagicMock(),
-            embeddings_model=MagicMock(),
-            browser_model=MagicMock(),
-            mcp_servers="{}",
-        )
-        system = TenantContext.system()
-        ctx = AgentContext(config=config, tenant_ctx=system)
-        result = _get_chats_folder(ctx)
-        assert result == "usr/chats"
-
-        # Clean up
-        from agent import AgentContext as AC
-
-        with AC._contexts_lock:
-            AC._contexts.pop(ctx.id, None)
-
-    def test_get_chats_folder_user(self):
-        from agent import AgentConfig, AgentContext
-
-        from python.helpers.persist_chat import _get_chats_folder
-        from python.helpers.tenant import TenantContext
-
-        config = AgentConfig(
-            chat_model=MagicMock(),
-            utility_model=MagicMock(),
-            embeddings_model=MagicMock(),
-            browser_model=MagicMock(),
-            mcp_servers="{}",
-        )
-        tenant = TenantContext(user_id="user-x")
-        ctx = AgentContext(config=config, user_id="user-x", tenant_ctx=tenant)
-        result = _get_chats_folder(ctx)
-        assert result == "usr/orgs/default/teams/default/members/user-x/chats"
-
-        # Clean up
-        from agent import AgentContext as AC
-
-        with AC._contexts_lock:
-            AC._contexts.pop(ctx.id, None)
+            assert b'"version": "existing"' in dst.read_bytes()
@@ -4,21 +4,24 @@ Covers: Casbin enforcer initialization, permission checks, role sync,
 domain matching, wildcard matching, no-auth bypass, system admin bypass,
 handler permission declarations, and 403 response behavior.
 
-All tests use in-memory SQLite for full isolation.
+All tests use the shared in-memory SQLite engine from ``conftest.py``, which
+is emptied (including Casbin rules) after every test.
 
 Note: The Casbin model uses ``g = _, _`` (no domain in grouping) because
 pycasbin's default RoleManager does not support domain-scoped ``has_link``.
 Domain matching is handled entirely in the matchers via ``keyMatch(r.dom, p.dom)``.
 """
 
+import importlib
 import json
+from contextlib import nullcontext
 from unittest.mock import patch
 
 import pytest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from flask import Response
 
-from python.helpers.auth_db import Base
+from python.helpers import auth_db, rbac, user_store
+from python.helpers.api import ApiHandler
 
 # ---------------------------------------------------------------------------
 # Shared fixtures
@@ -28,120 +31,105 @@ from python.helpers.auth_db import Base
 @pytest.fixture(autouse=True)
 def _reset_rbac_singleton():
     """Reset RBAC enforcer singleton between tests."""
-    from python.helpers import rbac
-
     rbac._enforcer = None
+    rbac.invalidate_permission_cache()
     yield
     rbac._enforcer = None
-
-
-@pytest.fixture
-def db_engine():
-    """Provide an in-memory SQLite engine with all auth tables."""
-    import python.helpers.user_store  # noqa: F401 — ensure models register
-
-    engine = create_engine("sqlite:///:memory:", echo=False)
-    Base.metadata.create_all(engine)
-    yield engine
-    Base.metadata.drop_all(engine)
-    engine.dispose()
-
-
-@pytest.fixture
-def db_session(db_engine):
-    """Provide a session from the in-memory engine."""
-    _Session = sessionmaker(bind=db_engine)
-    session = _Session()
-    yield session
-    session.close()
+    rbac.invalidate_permission_cache()
 
 
 @pytest.fixture
 def enforcer(db_engine):
     """Initialize a Casbin enforcer backed by the in-memory DB."""
-    from python.helpers import rbac
-
     # Patch auth_db.get_engine to return our test engine
     with patch("python.helpers.rbac.auth_db.get_engine", return_value=db_engine):
         e = rbac.init_enforcer()
     return e
 
 
+@pytest.fixture(scope="session")
+def _default_policy_rules():
+    """The default policy rules as Casbin rule lists, built once per run."""
+    return [list(rule) for rule in rbac._DEFAULT_POLICIES]
+
+
 @pytest.fixture
-def seeded_enforcer(enforcer):
-    """Enforcer with default policies seeded."""
-    from python.helpers import rbac
+def seeded_enforcer(enforcer, _default_policy_rules):
+    """Enforcer with default policies loaded in one batch.
 
-    rbac.seed_default_policies()
+    ``seed_default_policies`` itself is covered by ``TestPolicySeeding``.
+    """
+    enforcer.add_policies(_default_policy_rules)
+    rbac.invalidate_permission_cache()
     return enforcer
 
 
 @pytest.fixture
-def populated_db(db_session, db_engine):
-    """Create test org, team, and users for role sync tests."""
-    from python.helpers import user_store
-
-    # Create org and team
-    org = user_store.create_organization(db_session, name="Acme Corp", slug="acme")
-    team = user_store.create_team(
-        db_session, org_id=org.id, name="Engineering", slug="eng"
+def mock_session(db_session, monkeypatch):
+    """Route ``rbac``'s ``auth_db.get_session()`` to the test session."""
+    monkeypatch.setattr(
+        "python.helpers.rbac.auth_db.get_session", lambda: nullcontext(db_session)
     )
-    db_session.flush()
+    return db_session
 
-    # Create admin user (system admin)
-    admin = user_store.User(
-        id="admin-001",
-        email="admin@acme.com",
-        display_name="Admin",
-        auth_provider="local",
-        is_system_admin=True,
-    )
-    db_session.add(admin)
-
-    # Create regular member
-    member = user_store.User(
-        id="member-001",
-        email="member@acme.com",
-        display_name="Member",
-        auth_provider="local",
-        is_system_admin=False,
-    )
-    db_session.add(member)
-
-    # Create viewer
-    viewer = user_store.User(
-        id="viewer-001",
-        email="viewer@acme.com",
-        display_name="Viewer",
-        auth_provider="local",
-        is_system_admin=False,
-    )
-    db_session.add(viewer)
 
-    db_session.flush()
+@pytest.fixture
+def populated_db(db_session, db_engine):
+    """Create test org, team, and users for role sync tests.
 
-    # Admin is org owner + team lead
-    db_session.add(
-        user_store.OrgMembership(user_id=admin.id, org_id=org.id, role="owner")
+    Users and memberships go in through the bulk APIs, so the returned
+    ``admin``/``member``/``viewer`` entries are user ids, not ORM instances.
+    """
+    # Create org and team
+    org = user_store.create_organization(
+        db_session, name="Acme Corp", slug="acme", id="org-acme"
     )
-    db_session.add(
-        user_store.TeamMembership(user_id=admin.id, team_id=team.id, role="lead")
+    team = user_store.create_team(
+        db_session, org_id=org.id, name="Engineering", slug="eng", id="team-eng"
     )
+    db_session.flush()
 
-    # Member is org member + team member
-    db_session.add(
-        user_store.OrgMembership(user_id=member.id, org_id=org.id, role="member")
-    )
-    db_session.add(
-        user_store.TeamMembership(user_id=member.id, team_id=team.id, role="member")
+    # Admin is a system admin; member and viewer are regular users
+    db_session.bulk_insert_mappings(
+        user_store.User,
+        [
+            {
+                "id": user_id,
+                "email": f"{name.lower()}@acme.com",
+                "display_name": name,
+                "auth_provider": "local",
+                "is_system_admin": name == "Admin",
+            }
+            for user_id, name in (
+                ("admin-001", "Admin"),
+                ("member-001", "Member"),
+                ("viewer-001", "Viewer"),
+            )
+        ],
     )
 
-    # Viewer is org member + team viewer
-    db_session.add(
-        user_store.OrgMembership(user_id=viewer.id, org_id=org.id, role="member")
-    )
-    db_session.add(
-        user_store.TeamMembership(user_id=viewer.id, team_id=team.id, role="viewer")
+    db_session.bulk_save_objects(
+        [
+            # Admin is org owner + team lead
+            user_store.OrgMembership(user_id="admin-001", org_id=org.id, role="owner"),
+            user_store.TeamMembership(
+                user_id="admin-001", team_id=team.id, role="lead"
+            ),
+            # Member is org member + team member
+            user_store.OrgMembership(
+                user_id="member-001", org_id=org.id, role="member"
+            ),
+            user_store.TeamMembership(
+                user_id="member-001", team_id=team.id, role="member"
+            ),
+            # Viewer is org member + team viewer
+            user_store.OrgMembership(
+                user_id="viewer-001", org_id=org.id, role="member"
+            ),
+            user_store.TeamMembership(
+                user_id="viewer-001", team_id=team.id, role="viewer"
+            ),
+        ]
     )
 
     db_session.commit()
@@ -149,9 +137,9 @@ def populated_db(db_session, db_engine):
     return {
         "org": org,
         "team": team,
-        "admin": admin,
-        "member": member,
-        "viewer": viewer,
+        "admin": "admin-001",
+        "member": "member-001",
+        "viewer": "viewer-001",
     }
 
 
@@ -163,23 +151,26 @@ def populated_db(db_session, db_engine):
 class TestEnforcerSetup:
     def test_enforcer_created(self, enforcer):
         """Enforcer should be created and cached."""
-        from python.helpers import rbac
-
         assert enforcer is not None
         assert rbac.get_enforcer() is enforcer
 
     def test_enforcer_singleton(self, enforcer, db_engine):
         """Calling init_enforcer again returns the same instance."""
-        from python.helpers import rbac
-
         with patch("python.helpers.rbac.auth_db.get_engine", return_value=db_engine):
             e2 = rbac.init_enforcer()
         assert e2 is enforcer
 
+    def test_model_parsed_once_and_copied(self):
+        """Each enforcer gets its own copy of the once-parsed model."""
+        first = rbac._new_model()
+        template = rbac._model_template
+        second = rbac._new_model()
+        assert rbac._model_template is template
+        assert first is not second
+        assert first is not template
+
     def test_get_enforcer_before_init_raises(self):
         """get_enforcer should raise if init_enforcer was not called."""
-        from python.helpers import rbac
-
         with pytest.raises(RuntimeError, match="not initialized"):
             rbac.get_enforcer()
 
@@ -192,8 +183,6 @@ class TestEnforcerSetup:
 class TestPolicySeeding:
     def test_seed_default_policies(self, enforcer):
         """seed_default_policies should add the expected rules."""
-        from python.helpers import rbac
-
         rbac.seed_default_policies()
         # system_admin should have wildcard policy
         assert enforcer.has_policy("system_admin", "*", "*", "*")
@@ -205,8 +194,6 @@ class TestPolicySeeding:
 
     def test_seed_idempotent(self, enforcer):
         """Calling seed_default_policies twice should not duplicate rules."""
-        from python.helpers import rbac
-
         rbac.seed_default_policies()
         policies_before = enforcer.get_policy()
         rbac.seed_default_policies()
@@ -280,17 +267,9 @@ class TestPermissionChecks:
 
 
 class TestRoleSync:
-    def test_sync_user_roles_admin(self, seeded_enforcer, db_engine, populated_db):
+    def test_sync_user_roles_admin(self, seeded_enforcer, mock_session, populated_db):
         """sync_user_roles should add system_admin + org/team roles for admin."""
-        from python.helpers import rbac
-
-        with patch("python.helpers.rbac.auth_db.get_session") as mock_session_ctx:
-            _Session = sessionmaker(bind=db_engine)
-            session = _Session()
-            mock_session_ctx.return_value.__enter__ = lambda _: session
-            mock_session_ctx.return_value.__exit__ = lambda *_: None
-
-            rbac.sync_user_roles("admin-001")
+        rbac.sync_user_roles("admin-001")
 
         # Admin should have system_admin, org_owner, team_lead roles
         roles = seeded_enforcer.get_filtered_grouping_policy(0, "admin-001")
@@ -299,37 +278,21 @@ class TestRoleSync:
         assert "org_owner" in role_names
         assert "team_lead" in role_names
 
-    def test_sync_user_roles_member(self, seeded_enforcer, db_engine, populated_db):
+    def test_sync_user_roles_member(self, seeded_enforcer, mock_session, populated_db):
         """sync_user_roles should add member roles for regular user."""
-        from python.helpers import rbac
-
-        with patch("python.helpers.rbac.auth_db.get_session") as mock_session_ctx:
-            _Session = sessionmaker(bind=db_engine)
-            session = _Session()
-            mock_session_ctx.return_value.__enter__ = lambda _: session
-            mock_session_ctx.return_value.__exit__ = lambda *_: None
-
-            rbac.sync_user_roles("member-001")
+        rbac.sync_user_roles("member-001")
 
         roles = seeded_enforcer.get_filtered_grouping_policy(0, "member-001")
         role_names = [r[1] for r in roles]
         assert "member" in role_names
         assert "system_admin" not in role_names
 
-    def test_sync_replaces_old_roles(self, seeded_enforcer, db_engine, populated_db):
+    def test_sync_replaces_old_roles(self, seeded_enforcer, mock_session, populated_db):
         """sync_user_roles should replace (not append) existing roles."""
-        from python.helpers import rbac
-
         # Add a stale role manually (2-arg: no domain)
         seeded_enforcer.add_grouping_policy("member-001", "org_owner")
 
-        with patch("python.helpers.rbac.auth_db.get_session") as mock_session_ctx:
-            _Session = sessionmaker(bind=db_engine)
-            session = _Session()
-            mock_session_ctx.return_value.__enter__ = lambda _: session
-            mock_session_ctx.return_value.__exit__ = lambda *_: None
-
-            rbac.sync_user_roles("member-001")
+        rbac.sync_user_roles("member-001")
 
         roles = seeded_enforcer.get_filtered_grouping_policy(0, "member-001")
         role_names = [r[1] for r in roles]
@@ -337,26 +300,43 @@ class TestRoleSync:
         assert "org_owner" not in role_names
         assert "member" in role_names
 
-    def test_sync_deduplicates_roles(self, seeded_enforcer, db_engine, populated_db):
+    def test_sync_deduplicates_roles(self, seeded_enforcer, mock_session, populated_db):
         """sync_user_roles should not add the same role twice.
 
         member-001 has both OrgMembership(member) and TeamMembership(member)
         which both map to the Casbin role "member", but it should only appear once.
         """
-        from python.helpers import rbac
-
-        with patch("python.helpers.rbac.auth_db.get_session") as mock_session_ctx:
-            _Session = sessionmaker(bind=db_engine)
-            session = _Session()
-            mock_session_ctx.return_value.__enter__ = lambda _: session
-            mock_session_ctx.return_value.__exit__ = lambda *_: None
-
-            rbac.sync_user_roles("member-001")
+        rbac.sync_user_roles("member-001")
 
         roles = seeded_enforcer.get_filtered_grouping_policy(0, "member-001")
         role_names = [r[1] for r in roles]
         assert role_names.count("member") == 1
 
+    def test_get_user_roles_after_sync(
+        self, seeded_enforcer, mock_session, populated_db
+    ):
+        """get_user_roles should reflect the roles written by sync_user_roles."""
+        rbac.sync_user_roles("admin-001")
+
+        assert rbac.get_user_roles("admin-001") == {
+            "system_admin",
+            "org_owner",
+            "team_lead",
+        }
+
+    def test_load_tenant_policies(self, seeded_enforcer, mock_session, populated_db):
+        """Tenant loading keeps the org's members and drops outside users."""
+        seeded_enforcer.add_grouping_policy("member-001", "member")
+        seeded_enforcer.add_grouping_policy("outsider-001", "member")
+        args = ("org:acme/team:eng", "chats", "create")
+
+        rbac.load_tenant_policies(populated_db["org"].id)
+        assert rbac.check_permission("member-001", *args)
+        assert not rbac.check_permission("outsider-001", *args)
+
+        rbac.clear_tenant_policies()
+        assert rbac.check_permission("outsider-001", *args)
+
 
 # ---------------------------------------------------------------------------
 # 5. Domain Matching (keyMatch in matchers, not in g())
@@ -386,6 +366,16 @@ class TestDomainMatching:
         assert e.enforce("admin-001", "org:acme", "admin", "backup")
         assert e.enforce("admin-001", "org:acme", "mcp", "read")
 
+    def test_key_match_fast_path_semantics(self):
+        """The registered keyMatch keeps Casbin's prefix-wildcard semantics."""
+        assert rbac._key_match("org:acme", "org:acme")
+        assert not rbac._key_match("org:acme", "org:other")
+        assert rbac._key_match("org:acme/team:eng", "org:*/team:*")
+        assert rbac._key_match("org:acme", "org:*")
+        assert rbac._key_match("anything", "*")
+        assert not rbac._key_match("team:eng", "org:*")
+        assert not rbac._key_match("org", "org:*")
+
 
 # ---------------------------------------------------------------------------
 # 6. Wildcard Matching
@@ -416,7 +406,6 @@ class TestWildcardMatching:
 class TestNoAuthBypass:
     def test_rbac_skipped_when_no_user(self):
         """When g.current_user is None, RBAC should be skipped."""
-        from python.helpers.api import ApiHandler
 
         # Create a handler with a permission requirement
         class TestHandler(ApiHandler):
@@ -470,76 +459,93 @@ class TestSystemAdminBypass:
 # ---------------------------------------------------------------------------
 
 
-class TestHandlerDeclarations:
-    def test_chat_create_permission(self):
-        from python.api.chat_create import CreateChat
-
-        assert CreateChat.get_required_permission() == ("chats", "create")
-
-    def test_chat_load_permission(self):
-        from python.api.chat_load import LoadChats
-
-        assert LoadChats.get_required_permission() == ("chats", "read_own")
-
-    def test_settings_get_permission(self):
-        from python.api.settings_get import GetSettings
-
-        assert GetSettings.get_required_permission() == ("settings", "read")
-
-    def test_settings_set_permission(self):
-        from python.api.settings_set import SetSettings
-
-        assert SetSettings.get_required_permission() == ("settings", "write")
-
-    def test_backup_create_permission(self):
-        from python.api.backup_create import BackupCreate
-
-        assert BackupCreate.get_required_permission() == ("admin", "backup")
-
-    def test_restart_permission(self):
-        from python.api.restart import Restart
-
-        assert Restart.get_required_permission() == ("admin", "system")
-
-    def test_csrf_token_no_permission(self):
-        from python.api.csrf_token import GetCsrfToken
+# Handler class name -> python.api module that defines it
+_API_HANDLER_MODULES = {
+    "CreateChat": "chat_create",
+    "LoadChats": "chat_load",
+    "GetSettings": "settings_get",
+    "SetSettings": "settings_set",
+    "BackupCreate": "backup_create",
+    "Restart": "restart",
+    "GetCsrfToken": "csrf_token",
+    "Poll": "poll",
+    "HealthCheck": "health",
+    "McpServersApply": "mcp_servers_apply",
+    "ImportKnowledge": "import_knowledge",
+    "Tunnel": "tunnel",
+    "GetBanners": "banners",
+    "MemoryDashboard": "memory_dashboard",
+}
+
+
+@pytest.fixture(scope="session")
+def api_handlers():
+    """Look up a handler class by name, importing only its own module.
+
+    ``importlib`` caches the modules, and a handler that fails to import only
+    fails its own test.
+    """
+    return lambda name: getattr(
+        importlib.import_module(f"python.api.{_API_HANDLER_MODULES[name]}"), name
+    )
 
-        assert GetCsrfToken.get_required_permission() is None
 
-    def test_poll_no_permission(self):
-        from python.api.poll import Poll
+class TestHandlerDeclarations:
+    def test_chat_create_permission(self, api_handlers):
+        handler = api_handlers("CreateChat")
+        assert handler.get_required_permission() == ("chats", "create")
 
-        assert Poll.get_required_permission() is None
+    def test_chat_load_permission(self, api_handlers):
+        handler = api_handlers("LoadChats")
+        assert handler.get_required_permission() == ("chats", "read_own")
 
-    def test_health_no_permission(self):
-        from python.api.health import HealthCheck
+    def test_settings_get_permission(self, api_handlers):
+        handler = api_handlers("GetSettings")
+        assert handler.get_required_permission() == ("settings", "read")
 
-        assert HealthCheck.get_required_permission() is None
+    def test_settings_set_permission(self, api_handlers):
+        handler = api_handlers("SetSettings")
+        assert handler.get_required_permission() == ("settings", "write")
 
-    def test_mcp_servers_apply_permission(self):
-        from python.api.mcp_servers_apply import McpServersApply
+    def test_backup_create_permission(self, api_handlers):
+        handler = api_handlers("BackupCreate")
+        assert handler.get_required_permission() == ("admin", "backup")
 
-        assert McpServersApply.get_required_permission() == ("mcp", "write")
+    def test_restart_permission(self, api_handlers):
+        handler = api_handlers("Restart")
+        assert handler.get_required_permission() == ("admin", "system")
 
-    def test_knowledge_import_permission(self):
-        from python.api.import_knowledge import ImportKnowledge
+    def test_csrf_token_no_permission(self, api_handlers):
+        handler = api_handlers("GetCsrfToken")
+        assert handler.get_required_permission() is None
 
-        assert ImportKnowledge.get_required_permission() == ("knowledge", "upload")
+    def test_poll_no_permission(self, api_handlers):
+        handler = api_handlers("Poll")
+        assert handler.get_required_permission() is None
 
-    def test_tunnel_permission(self):
-        from python.api.tunnel import Tunnel
+    def test_health_no_permission(self, api_handlers):
+        handler = api_handlers("HealthCheck")
+        assert handler.get_required_permission() is None
 
-        assert Tunnel.get_required_permission() == ("admin", "tunnel")
+    def test_mcp_servers_apply_permission(self, api_handlers):
+        handler = api_handlers("McpServersApply")
+        assert handler.get_required_permission() == ("mcp", "write")
 
-    def test_banners_permission(self):
-        from python.api.banners import GetBanners
+    def test_knowledge_import_permission(self, api_handlers):
+        handler = api_handlers("ImportKnowledge")
+        assert handler.get_required_permission() == ("knowledge", "upload")
 
-        assert GetBanners.get_required_permission() == ("system", "read")
+    def test_tunnel_permission(self, api_handlers):
+        handler = api_handlers("Tunnel")
+        assert handler.get_required_permission() == ("admin", "tunnel")
 
-    def test_memory_dashboard_permission(self):
-        from python.api.memory_dashboard import MemoryDashboard
+    def test_banners_permission(self, api_handlers):
+        handler = api_handlers("GetBanners")
+        assert handler.get_required_permission() == ("system", "read")
 
-        assert MemoryDashboard.get_required_permission() == ("memory", "read")
+    def test_memory_dashboard_permission(self, api_handlers):
+        handler = api_handlers("MemoryDashboard")
+        assert handler.get_required_permission() == ("memory", "read")
 
 
 # ---------------------------------------------------------------------------
@@ -550,8 +556,6 @@ class TestHandlerDeclarations:
 class TestForbiddenResponse:
     def test_forbidden_response_format(self):
         """The 403 response should be JSON with an error key."""
-        from flask import Response
-
         # Simulate what handle_request produces for forbidden
         response = Response(
             json.dumps({"error": "Forbidden"}),
@@ -571,15 +575,11 @@ class TestForbiddenResponse:
 class TestCheckPermission:
     def test_check_permission_allowed(self, seeded_enforcer):
         """check_permission should return True for allowed actions."""
-        from python.helpers import rbac
-
         seeded_enforcer.add_grouping_policy("user-001", "member")
         assert rbac.check_permission("user-001", "org:acme/team:eng", "chats", "create")
 
     def test_check_permission_denied(self, seeded_enforcer):
         """check_permission should return False for denied actions."""
-        from python.helpers import rbac
-
         seeded_enforcer.add_grouping_policy("user-001", "member")
         assert not rbac.check_permission(
             "user-001", "org:acme/team:eng", "admin", "backup"
@@ -587,12 +587,64 @@ class TestCheckPermission:
 
     def test_check_permission_no_roles(self, seeded_enforcer):
         """check_permission should return False for users without roles."""
-        from python.helpers import rbac
-
         assert not rbac.check_permission(
             "nobody", "org:acme/team:eng", "chats", "read_own"
         )
 
+    def test_check_permission_system_admin_short_circuit(self):
+        """is_system_admin=True should allow without touching the enforcer."""
+        assert rbac._enforcer is None
+        assert rbac.check_permission(
+            "admin-001", "org:acme", "admin", "backup", is_system_admin=True
+        )
+
+    def test_check_permission_cached(self, seeded_enforcer):
+        """Repeated checks should be served from the decision cache."""
+        seeded_enforcer.add_grouping_policy("user-001", "member")
+        args = ("user-001", "org:acme/team:eng", "chats", "create")
+        assert rbac.check_permission(*args)
+        hits_before = rbac._cached_enforce.cache_info().hits
+        assert rbac.check_permission(*args)
+        assert rbac._cached_enforce.cache_info().hits == hits_before + 1
+
+    def test_tenant_domain_interned(self):
+        """tenant_domain should format the domain and return one shared string."""
+        domain = rbac.tenant_domain("acme", "eng")
+        assert domain == "org:acme/team:eng"
+        assert rbac.tenant_domain("acme", "eng") is domain
+
+    def test_check_permission_matches_enforcer(self, seeded_enforcer):
+        """The per-role policy index should agree with Casbin's own matcher."""
+        grants = {
+            "admin-001": "system_admin",
+            "owner-001": "org_owner",
+            "lead-001": "team_lead",
+            "viewer-001": "viewer",
+            "nobody-001": "unknown_role",
+        }
+        for user_id, role in grants.items():
+            seeded_enforcer.add_grouping_policy(user_id, role)
+
+        for user_id in grants:
+            for domain in ("org:acme", "org:acme/team:eng", "team:eng"):
+                for resource, action in (
+                    ("chats", "create"),
+                    ("admin", "backup"),
+                    ("settings", "read"),
+                    ("mcp", "execute"),
+                ):
+                    args = (user_id, domain, resource, action)
+                    expected = seeded_enforcer.enforce(*args)
+                    assert rbac.check_permission(*args) == expected, args
+
+    def test_check_permission_cache_invalidated(self, seeded_enforcer):
+        """Invalidating the cache should expose newly granted roles."""
+        args = ("user-001", "org:acme/team:eng", "chats", "create")
+        assert not rbac.check_permission(*args)
+        seeded_enforcer.add_grouping_policy("user-001", "member")
+        rbac.invalidate_permission_cache()
+        assert rbac.check_permission(*args)
+
 
 # ---------------------------------------------------------------------------
 # 12. Role Mapping Functions
@@ -601,20 +653,16 @@ class TestCheckPermission:
 
 class TestRoleMappings:
     def test_map_org_role(self):
-        from python.helpers.rbac import _map_org_role
-
-        assert _map_org_role("owner") == "org_owner"
-        assert _map_org_role("admin") == "org_admin"
-        assert _map_org_role("member") == "member"
-        assert _map_org_role("unknown") == "member"
+        assert rbac._map_org_role("owner") == "org_owner"
+        assert rbac._map_org_role("admin") == "org_admin"
+        assert rbac._map_org_role("member") == "member"
+        assert rbac._map_org_role("unknown") == "member"
 
     def test_map_team_role(self):
-        from python.helpers.rbac import _map_team_role
-
-        assert _map_team_role("lead") == "team_lead"
-        assert _map_team_role("member") == "member"
-        assert _map_team_role("viewer") == "viewer"
-        assert _map_team_role("unknown") == "member"
+        assert rbac._map_team_role("lead") == "team_lead"
+        assert rbac._map_team_role("member") == "member"
+        assert rbac._map_team_role("viewer") == "viewer"
+        assert rbac._map_team_role("unknown") == "member"
 
 
 # ---------------------------------------------------------------------------
@@ -622,11 +670,11 @@ class TestRoleMappings:
 # ---------------------------------------------------------------------------
 
 
+# Both tests swap the module-level ``auth_db._engine``; keep them on one worker.
+@pytest.mark.xdist_group("auth_db_global")
 class TestAuthDbGetEngine:
     def test_get_engine_before_init_raises(self):
         """get_engine should raise if init_db was not called."""
-        from python.helpers import auth_db
-
         saved = auth_db._engine
         try:
             auth_db._engine = None
@@ -635,14 +683,11 @@ class TestAuthDbGetEngine:
         finally:
             auth_db._engine = saved
 
-    def test_get_engine_returns_engine(self):
+    def test_get_engine_returns_engine(self, db_engine):
         """get_engine should return the engine after init_db."""
-        from python.helpers import auth_db
-
         saved = auth_db._engine
         try:
-            engine = create_engine("sqlite:///:memory:")
-            auth_db._engine = engine
-            assert auth_db.get_engine() is engine
+            auth_db._engine = db_engine
+            assert auth_db.get_engine() is db_engine
         finally:
             auth_db._engine = saved
@@ -5,49 +5,42 @@ Covers: MCP service registry CRUD, MCP connection CRUD, VaultTokenStorage
 the ``mcp_service_registry`` and ``mcp_connections`` tables.
 
 All tests use in-memory SQLite for full isolation.
+Tests call ``db_session.flush()`` only before reading column defaults or
+relying on rows from another session; queries autoflush pending writes.
 """
 
 import json
-import uuid
 
 import pytest
+from mcp.shared.auth import OAuthClientInformationFull, OAuthToken
 from sqlalchemy import inspect
-from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.orm import Session
+
+from python.helpers import vault_crypto
+from python.helpers.mcp_oauth import VaultTokenStorage
+from python.helpers.user_store import (
+    ApiKeyVault,
+    create_service,
+    create_services_bulk,
+    delete_connection,
+    delete_service,
+    get_connection,
+    get_service,
+    list_connection_ids,
+    list_connections,
+    list_services,
+    list_services_lite,
+    store_vault_key,
+    update_service,
+    upsert_connection,
+)
 
 pytestmark = pytest.mark.usefixtures("_reset_vault_master_key")
 
 
-@pytest.fixture
-def test_org(db_session: Session):
-    """Create and return a test organization."""
-    from python.helpers.user_store import create_organization
-
-    org = create_organization(db_session, name="Test Org", slug="test-org")
-    db_session.flush()
-    return org
-
-
-@pytest.fixture
-def test_user(db_session: Session):
-    """Create and return a test user."""
-    from python.helpers.user_store import User
-
-    user = User(
-        id=str(uuid.uuid4()),
-        email="mcpuser@example.com",
-        display_name="MCP User",
-        auth_provider="local",
-    )
-    db_session.add(user)
-    db_session.flush()
-    return user
-
-
 @pytest.fixture
 def test_service(db_session: Session, test_org):
     """Create and return a test MCP service (stdio)."""
-    from python.helpers.user_store import create_service
-
     service = create_service(
         db_session,
         name="Test stdio service",
@@ -56,10 +49,30 @@ def test_service(db_session: Session, test_org):
         args_json=json.dumps(["server.js"]),
         org_id=test_org.id,
     )
-    db_session.flush()
     return service
 
 
+@pytest.fixture(scope="module")
+def _token_template():
+    """OAuth token validated once; tests take a ``model_copy()``."""
+    return OAuthToken(
+        access_token="access-abc-123",
+        token_type="Bearer",
+        refresh_token="refresh-xyz-789",
+        expires_in=3600,
+    )
+
+
+@pytest.fixture(scope="module")
+def _client_info_template():
+    """OAuth client info validated once; tests take a ``model_copy()``."""
+    return OAuthClientInformationFull(
+        client_id="my-client-id",
+        client_secret="my-client-secret",
+        redirect_uris=["https://app.example.com/callback"],
+    )
+
+
 # ===================================================================
 # 1. MCP Service Registry CRUD tests
 # ===================================================================
@@ -68,59 +81,79 @@ def test_service(db_session: Session, test_org):
 class TestMcpServiceRegistryCrud:
     """Tests for MCP service registry CRUD in python.helpers.user_store."""
 
-    def test_create_service_stdio(self, db_session: Session, test_org):
-        """create_service() with stdio transport must persist correct fields."""
-        from python.helpers.user_store import create_service
+    @pytest.mark.parametrize(
+        "kwargs, expected",
+        [
+            (
+                {
+                    "name": "My stdio tool",
+                    "transport_type": "stdio",
+                    "command": "python",
+                    "args_json": json.dumps(["-m", "mcp_server"]),
+                    "env_keys_json": json.dumps(["MY_API_KEY"]),
+                },
+                {
+                    "name": "My stdio tool",
+                    "transport_type": "stdio",
+                    "command": "python",
+                    "args_json": ["-m", "mcp_server"],
+                    "env_keys_json": ["MY_API_KEY"],
+                },
+            ),
+            (
+                # Lists are serialized by create_service() itself
+                {
+                    "name": "List args tool",
+                    "transport_type": "stdio",
+                    "command": "python",
+                    "args_json": ["-m", "mcp_server"],
+                    "env_keys_json": ["MY_API_KEY"],
+                },
+                {
+                    "args_json": ["-m", "mcp_server"],
+                    "env_keys_json": ["MY_API_KEY"],
+                },
+            ),
+            (
+                {
+                    "name": "Remote MCP",
+                    "transport_type": "streamable_http",
+                    "server_url": "https://mcp.example.com/v1",
+                    "client_id": "oauth-client-abc",
+                    "default_scopes": "read write",
+                },
+                {
+                    "name": "Remote MCP",
+                    "transport_type": "streamable_http",
+                    "server_url": "https://mcp.example.com/v1",
+                    "client_id": "oauth-client-abc",
+                    "default_scopes": "read write",
+                },
+            ),
+        ],
+        ids=["stdio", "stdio_list_args", "streamable_http"],
+    )
+    def test_create_service_fields(
+        self, db_session: Session, test_org, kwargs, expected
+    ):
+        """create_service() must persist the given fields and column defaults.
 
-        service = create_service(
-            db_session,
-            name="My stdio tool",
-            transport_type="stdio",
-            command="python",
-            args_json=json.dumps(["-m", "mcp_server"]),
-            env_keys_json=json.dumps(["MY_API_KEY"]),
-            org_id=test_org.id,
-        )
-        db_session.flush()
+        ``*_json`` columns are compared after decoding.
+        """
+        service = create_service(db_session, org_id=test_org.id, **kwargs)
 
         assert service.id is not None
-        assert service.name == "My stdio tool"
-        assert service.transport_type == "stdio"
-        assert service.command == "python"
-        assert json.loads(service.args_json) == ["-m", "mcp_server"]
-        assert json.loads(service.env_keys_json) == ["MY_API_KEY"]
         assert service.org_id == test_org.id
         assert service.is_enabled is True
         assert service.created_at is not None
-
-    def test_create_service_http(self, db_session: Session, test_org):
-        """create_service() with streamable_http transport must persist correct fields."""
-        from python.helpers.user_store import create_service
-
-        service = create_service(
-            db_session,
-            name="Remote MCP",
-            transport_type="streamable_http",
-            server_url="https://mcp.example.com/v1",
-            client_id="oauth-client-abc",
-            default_scopes="read write",
-            org_id=test_org.id,
-        )
-        db_session.flush()
-
-        assert service.id is not None
-        assert service.name == "Remote MCP"
-        assert service.transport_type == "streamable_http"
-        assert service.server_url == "https://mcp.example.com/v1"
-        assert service.client_id == "oauth-client-abc"
-        assert service.default_scopes == "read write"
-        assert service.org_id == test_org.id
+        for attr, value in expected.items():
+            actual = getattr(service, attr)
+            if attr.endswith("_json"):
+                actual = json.loads(actual)
+            assert actual == value, attr
 
     def test_create_service_with_client_secret(self, db_session: Session, test_org):
         """create_service() with client_secret must encrypt it into client_secret_encrypted."""
-        from python.helpers import vault_crypto
-        from python.helpers.user_store import create_service
-
         service = create_service(
             db_session,
             name="Secret service",
@@ -130,7 +163,6 @@ class TestMcpServiceRegistryCrud:
             client_secret="super-secret-value",
             org_id=test_org.id,
         )
-        db_session.flush()
 
         # client_secret_encrypted should be set and not be plaintext
         assert service.client_secret_encrypted is not None
@@ -144,8 +176,6 @@ class TestMcpServiceRegistryCrud:
 
     def test_list_services_system_wide(self, db_session: Session):
         """list_services(org_id=None) returns only system-wide services."""
-        from python.helpers.user_store import create_service, list_services
-
         create_service(
             db_session,
             name="System service",
@@ -153,7 +183,6 @@ class TestMcpServiceRegistryCrud:
             command="echo",
             org_id=None,
         )
-        db_session.flush()
 
         services = list_services(db_session, org_id=None)
         assert len(services) == 1
@@ -162,25 +191,25 @@ class TestMcpServiceRegistryCrud:
 
     def test_list_services_org_scoped(self, db_session: Session, test_org):
         """list_services(org_id=X) returns org-specific AND system-wide services."""
-        from python.helpers.user_store import create_service, list_services
-
-        # Create a system-wide service
-        create_service(
+        create_services_bulk(
             db_session,
-            name="System global",
-            transport_type="stdio",
-            command="echo",
-            org_id=None,
-        )
-        # Create an org-scoped service
-        create_service(
-            db_session,
-            name="Org specific",
-            transport_type="stdio",
-            command="node",
-            org_id=test_org.id,
+            [
+                # A system-wide service
+                {
+                    "name": "System global",
+                    "transport_type": "stdio",
+                    "command": "echo",
+                    "org_id": None,
+                },
+                # An org-scoped service
+                {
+                    "name": "Org specific",
+                    "transport_type": "stdio",
+                    "command": "node",
+                    "org_id": test_org.id,
+                },
+            ],
         )
-        db_session.flush()
 
         services = list_services(db_session, org_id=test_org.id)
         names = {s.name for s in services}
@@ -188,10 +217,25 @@ class TestMcpServiceRegistryCrud:
         assert "Org specific" in names
         assert len(services) == 2
 
+    def test_list_services_lite(self, db_session: Session, test_org):
+        """list_services_lite() returns rows without the client secret."""
+        service = create_service(
+            db_session,
+            name="Lite service",
+            transport_type="streamable_http",
+            server_url="https://mcp.example.com",
+            client_secret="super-secret",
+            org_id=test_org.id,
+        )
+
+        (row,) = list_services_lite(db_session, org_id=test_org.id)
+        assert row.id == service.id
+        assert row.name == "Lite service"
+        assert row.server_url == "https://mcp.example.com"
+        assert "client_secret_encrypted" not in row._fields
+
     def test_get_service(self, db_session: Session, test_org):
         """get_service() returns the correct service by ID."""
-        from python.helpers.user_store import create_service, get_service
-
         service = create_service(
             db_session,
             name="Findable service",
@@ -199,7 +243,6 @@ class TestMcpServiceRegistryCrud:
             command="cat",
             org_id=test_org.id,
         )
-        db_session.flush()
 
         found = get_service(db_session, service.id)
         assert found is not None
@@ -208,19 +251,11 @@ class TestMcpServiceRegistryCrud:
 
     def test_get_service_not_found(self, db_session: Session):
         """get_service() returns None for a non-existent ID."""
-        from python.helpers.user_store import get_service
-
         result = get_service(db_session, "nonexistent-id")
         assert result is None
 
     def test_update_service(self, db_session: Session, test_org):
         """update_service() must update name and server_url."""
-        from python.helpers.user_store import (
-            create_service,
-            get_service,
-            update_service,
-        )
-
         service = create_service(
             db_session,
             name="Old name",
@@ -228,7 +263,6 @@ class TestMcpServiceRegistryCrud:
             server_url="https://old.example.com",
             org_id=test_org.id,
         )
-        db_session.flush()
 
         update_service(
             db_session,
@@ -236,7 +270,6 @@ class TestMcpServiceRegistryCrud:
             name="New name",
             server_url="https://new.example.com",
         )
-        db_session.flush()
 
         updated = get_service(db_session, service.id)
         assert updated.name == "New name"
@@ -244,13 +277,6 @@ class TestMcpServiceRegistryCrud:
 
     def test_update_service_with_client_secret(self, db_session: Session, test_org):
         """update_service() with client_secret must encrypt the new value."""
-        from python.helpers import vault_crypto
-        from python.helpers.user_store import (
-            create_service,
-            get_service,
-            update_service,
-        )
-
         service = create_service(
             db_session,
             name="Updatable",
@@ -259,11 +285,9 @@ class TestMcpServiceRegistryCrud:
             client_secret="original-secret",
             org_id=test_org.id,
         )
-        db_session.flush()
         original_encrypted = service.client_secret_encrypted
 
         update_service(db_session, service.id, client_secret="new-secret")
-        db_session.flush()
 
         updated = get_service(db_session, service.id)
         assert updated.client_secret_encrypted != original_encrypted
@@ -274,12 +298,6 @@ class TestMcpServiceRegistryCrud:
 
     def test_delete_service(self, db_session: Session, test_org):
         """delete_service() must remove the service."""
-        from python.helpers.user_store import (
-            create_service,
-            delete_service,
-            get_service,
-        )
-
         service = create_service(
             db_session,
             name="Deleteable",
@@ -287,11 +305,9 @@ class TestMcpServiceRegistryCrud:
             command="echo",
             org_id=test_org.id,
         )
-        db_session.flush()
         service_id = service.id
 
         delete_service(db_session, service_id)
-        db_session.flush()
 
         assert get_service(db_session, service_id) is None
 
@@ -299,13 +315,6 @@ class TestMcpServiceRegistryCrud:
         self, db_session: Session, test_org, test_user
     ):
         """delete_service() must also remove associated connections."""
-        from python.helpers.user_store import (
-            create_service,
-            delete_service,
-            get_connection,
-            upsert_connection,
-        )
-
         service = create_service(
             db_session,
             name="Cascade test",
@@ -313,7 +322,6 @@ class TestMcpServiceRegistryCrud:
             command="echo",
             org_id=test_org.id,
         )
-        db_session.flush()
 
         upsert_connection(
             db_session,
@@ -321,7 +329,6 @@ class TestMcpServiceRegistryCrud:
             service_id=service.id,
             scopes_granted="read",
         )
-        db_session.flush()
 
         # Verify connection exists
         conn = get_connection(db_session, test_user.id, service.id)
@@ -329,7 +336,6 @@ class TestMcpServiceRegistryCrud:
 
         # Delete service — should cascade to connections
         delete_service(db_session, service.id)
-        db_session.flush()
 
         conn_after = get_connection(db_session, test_user.id, service.id)
         assert conn_after is None
@@ -347,8 +353,6 @@ class TestMcpConnectionCrud:
         self, db_session: Session, test_user, test_service
     ):
         """upsert_connection() creates a new connection when none exists."""
-        from python.helpers.user_store import upsert_connection
-
         conn = upsert_connection(
             db_session,
             user_id=test_user.id,
@@ -367,15 +371,12 @@ class TestMcpConnectionCrud:
         self, db_session: Session, test_user, test_service
     ):
         """upsert_connection() updates an existing connection's fields."""
-        from python.helpers.user_store import upsert_connection
-
         conn = upsert_connection(
             db_session,
             user_id=test_user.id,
             service_id=test_service.id,
             scopes_granted="read",
         )
-        db_session.flush()
         original_id = conn.id
 
         updated = upsert_connection(
@@ -392,15 +393,12 @@ class TestMcpConnectionCrud:
 
     def test_get_connection(self, db_session: Session, test_user, test_service):
         """get_connection() returns the correct connection."""
-        from python.helpers.user_store import get_connection, upsert_connection
-
         upsert_connection(
             db_session,
             user_id=test_user.id,
             service_id=test_service.id,
             scopes_granted="read",
         )
-        db_session.flush()
 
         conn = get_connection(db_session, test_user.id, test_service.id)
         assert conn is not None
@@ -409,38 +407,31 @@ class TestMcpConnectionCrud:
 
     def test_get_connection_not_found(self, db_session: Session):
         """get_connection() returns None for a non-existent connection."""
-        from python.helpers.user_store import get_connection
-
         result = get_connection(db_session, "no-user", "no-service")
         assert result is None
 
     def test_list_connections(self, db_session: Session, test_user, test_org):
         """list_connections() returns all connections for a user."""
-        from python.helpers.user_store import (
-            create_service,
-            list_connections,
-            upsert_connection,
-        )
-
-        svc1 = create_service(
+        svc1, svc2 = create_services_bulk(
             db_session,
-            name="Service A",
-            transport_type="stdio",
-            command="echo",
-            org_id=test_org.id,
-        )
-        svc2 = create_service(
-            db_session,
-            name="Service B",
-            transport_type="stdio",
-            command="cat",
-            org_id=test_org.id,
+            [
+                {
+                    "name": "Service A",
+                    "transport_type": "stdio",
+                    "command": "echo",
+                    "org_id": test_org.id,
+                },
+                {
+                    "name": "Service B",
+                    "transport_type": "stdio",
+                    "command": "cat",
+                    "org_id": test_org.id,
+                },
+            ],
         )
-        db_session.flush()
 
         upsert_connection(db_session, user_id=test_user.id, service_id=svc1.id)
         upsert_connection(db_session, user_id=test_user.id, service_id=svc2.id)
-        db_session.flush()
 
         conns = list_connections(db_session, test_user.id)
         assert len(conns) == 2
@@ -448,23 +439,31 @@ class TestMcpConnectionCrud:
         assert svc1.id in service_ids
         assert svc2.id in service_ids
 
-    def test_delete_connection(self, db_session: Session, test_user, test_service):
-        """delete_connection() removes the connection."""
-        from python.helpers.user_store import (
-            delete_connection,
-            get_connection,
-            upsert_connection,
+        assert sorted(list_connection_ids(db_session, test_user.id)) == sorted(
+            service_ids
         )
 
+    def test_list_connections_with_service(
+        self, db_session: Session, test_user, test_service
+    ):
+        """list_connections(with_service=True) eagerly loads each service."""
+        upsert_connection(db_session, user_id=test_user.id, service_id=test_service.id)
+        db_session.flush()
+        db_session.expunge_all()
+
+        (conn,) = list_connections(db_session, test_user.id, with_service=True)
+        assert "service" in conn.__dict__
+        assert conn.service.name == "Test stdio service"
+
+    def test_delete_connection(self, db_session: Session, test_user, test_service):
+        """delete_connection() removes the connection."""
         upsert_connection(
             db_session,
             user_id=test_user.id,
             service_id=test_service.id,
         )
-        db_session.flush()
 
         delete_connection(db_session, test_user.id, test_service.id)
-        db_session.flush()
 
         assert get_connection(db_session, test_user.id, test_service.id) is None
 
@@ -472,29 +471,23 @@ class TestMcpConnectionCrud:
         self, db_session: Session, test_user, test_service
     ):
         """delete_connection() must also remove associated vault entries."""
-        from python.helpers.user_store import (
-            ApiKeyVault,
-            delete_connection,
-            store_vault_key,
-            upsert_connection,
-        )
+        owner_id = f"{test_user.id}:{test_service.id}"
 
         # Store vault entries for access and refresh tokens
         access_entry = store_vault_key(
             db_session,
             "mcp_token",
-            f"{test_user.id}:{test_service.id}",
+            owner_id,
             "access_token",
             "test-access-token",
         )
         refresh_entry = store_vault_key(
             db_session,
             "mcp_token",
-            f"{test_user.id}:{test_service.id}",
+            owner_id,
             "refresh_token",
             "test-refresh-token",
         )
-        db_session.flush()
 
         # Create connection referencing vault entries
         upsert_connection(
@@ -504,24 +497,16 @@ class TestMcpConnectionCrud:
             access_token_vault_id=access_entry.id,
             refresh_token_vault_id=refresh_entry.id,
         )
-        db_session.flush()
 
         access_id = access_entry.id
         refresh_id = refresh_entry.id
 
         # Delete connection
         delete_connection(db_session, test_user.id, test_service.id)
-        db_session.flush()
 
         # Vault entries should be gone
-        assert (
-            db_session.query(ApiKeyVault).filter(ApiKeyVault.id == access_id).first()
-            is None
-        )
-        assert (
-            db_session.query(ApiKeyVault).filter(ApiKeyVault.id == refresh_id).first()
-            is None
-        )
+        assert db_session.get(ApiKeyVault, access_id) is None
+        assert db_session.get(ApiKeyVault, refresh_id) is None
 
 
 # ===================================================================
@@ -533,47 +518,16 @@ class TestVaultTokenStorage:
     """Tests for VaultTokenStorage in python.helpers.mcp_oauth."""
 
     @pytest.fixture
-    def _wire_auth_db(self, db_session: Session):
-        """Wire auth_db module to use the in-memory test engine so that
-        get_session() works inside VaultTokenStorage methods.
-        """
-        from python.helpers import auth_db
-
-        engine = db_session.get_bind()
-        _Session = sessionmaker(bind=engine)
-
-        original_engine = auth_db._engine
-        original_session_local = auth_db._SessionLocal
-
-        auth_db._engine = engine
-        auth_db._SessionLocal = _Session
-
-        yield db_session
-
-        auth_db._engine = original_engine
-        auth_db._SessionLocal = original_session_local
-
-    @pytest.fixture
-    def storage_and_ids(self, _wire_auth_db, test_user, test_service):
+    def storage_and_ids(self, auth_db_wired, test_user, test_service):
         """Return a VaultTokenStorage instance along with user_id and service_id."""
-        from python.helpers.mcp_oauth import VaultTokenStorage
-
         storage = VaultTokenStorage(test_user.id, test_service.id)
         return storage, test_user.id, test_service.id
 
-    async def test_set_and_get_tokens_roundtrip(self, storage_and_ids):
+    async def test_set_and_get_tokens_roundtrip(self, storage_and_ids, _token_template):
         """set_tokens() then get_tokens() must recover the access token."""
-        from mcp.shared.auth import OAuthToken
-
         storage, user_id, service_id = storage_and_ids
 
-        tokens = OAuthToken(
-            access_token="access-abc-123",
-            token_type="Bearer",
-            refresh_token="refresh-xyz-789",
-            expires_in=3600,
-        )
-        await storage.set_tokens(tokens)
+        await storage.set_tokens(_token_template.model_copy())
 
         retrieved = await storage.get_tokens()
         assert retrieved is not None
@@ -590,18 +544,13 @@ class TestVaultTokenStorage:
         result = await storage.get_tokens()
         assert result is None
 
-    async def test_set_and_get_client_info(self, storage_and_ids):
+    async def test_set_and_get_client_info(
+        self, storage_and_ids, _client_info_template
+    ):
         """set_client_info() then get_client_info() must recover client fields."""
-        from mcp.shared.auth import OAuthClientInformationFull
-
         storage, _, _ = storage_and_ids
 
-        client_info = OAuthClientInformationFull(
-            client_id="my-client-id",
-            client_secret="my-client-secret",
-            redirect_uris=["https://app.example.com/callback"],
-        )
-        await storage.set_client_info(client_info)
+        await storage.set_client_info(_client_info_template.model_copy())
 
         retrieved = await storage.get_client_info()
         assert retrieved is not None
@@ -621,8 +570,6 @@ class TestVaultTokenStorage:
 
     async def test_set_tokens_without_refresh(self, storage_and_ids):
         """set_tokens() without refresh_token stores only access_token."""
-        from mcp.shared.auth import OAuthToken
-
         storage, _, _ = storage_and_ids
 
         tokens = OAuthToken(
@@ -642,24 +589,31 @@ class TestVaultTokenStorage:
 # ===================================================================
 
 
+@pytest.fixture(scope="module")
+def _schema(_auth_engine):
+    """Introspect the shared test schema once for the migration tests."""
+    inspector = inspect(_auth_engine)
+    return {
+        "tables": set(inspector.get_table_names()),
+        "service_cols": {
+            col["name"] for col in inspector.get_columns("mcp_service_registry")
+        },
+        "connection_cols": {
+            col["name"] for col in inspector.get_columns("mcp_connections")
+        },
+    }
+
+
 class TestMcpMigration:
     """Tests for the MCP migration (002_mcp_service_registry)."""
 
-    def test_migration_creates_tables(self, db_session: Session):
+    def test_migration_creates_tables(self, _schema):
         """Base.metadata.create_all() must create mcp_service_registry and mcp_connections tables."""
-        engine = db_session.get_bind()
-        inspector = inspect(engine)
-        tables = inspector.get_table_names()
-
-        assert "mcp_service_registry" in tables
-        assert "mcp_connections" in tables
+        assert "mcp_service_registry" in _schema["tables"]
+        assert "mcp_connections" in _schema["tables"]
 
-    def test_mcp_service_registry_columns(self, db_session: Session):
+    def test_mcp_service_registry_columns(self, _schema):
         """mcp_service_registry table must have all expected columns."""
-        engine = db_session.get_bind()
-        inspector = inspect(engine)
-        columns = {col["name"] for col in inspector.get_columns("mcp_service_registry")}
-
         expected_columns = {
             "id",
             "org_id",
@@ -676,14 +630,10 @@ class TestMcpMigration:
             "is_enabled",
             "created_at",
         }
-        assert expected_columns.issubset(columns)
+        assert expected_columns.issubset(_schema["service_cols"])
 
-    def test_mcp_connections_columns(self, db_session: Session):
+    def test_mcp_connections_columns(self, _schema):
         """mcp_connections table must have all expected columns."""
-        engine = db_session.get_bind()
-        inspector = inspect(engine)
-        columns = {col["name"] for col in inspector.get_columns("mcp_connections")}
-
         expected_columns = {
             "id",
             "user_id",
@@ -696,4 +646,4 @@ class TestMcpMigration:
             "connected_at",
             "last_used_at",
         }
-        assert expected_columns.issubset(columns)
+        assert expected_columns.issubset(_schema["connection_cols"])
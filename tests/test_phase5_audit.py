@@ -5,41 +5,46 @@ correct fields, and that tokens are never logged.
 """
 
 import json
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import partial
 
 import pytest
+from sqlalchemy import func, select
+
+from python.helpers import audit, auth_db
+from python.helpers.audit import AuditLog, create_audit_entry
+from python.helpers.user_store import User
+
+
+@contextmanager
+def _test_get_session(session):
+    """``auth_db.get_session()`` stand-in that yields the test session."""
+    try:
+        yield session
+        session.flush()
+    except Exception:
+        session.rollback()
+        raise
 
 
 @pytest.fixture(autouse=True)
 def _patch_auth_db(db_session, monkeypatch):
     """Patch auth_db.get_session to use the in-memory test database."""
-    from contextlib import contextmanager
-
-    from python.helpers import auth_db
+    monkeypatch.setattr(auth_db, "get_session", partial(_test_get_session, db_session))
 
-    @contextmanager
-    def _test_get_session():
-        try:
-            yield db_session
-            db_session.flush()
-        except Exception:
-            db_session.rollback()
-            raise
 
-    monkeypatch.setattr(auth_db, "get_session", _test_get_session)
+def _audit_count(session) -> int:
+    """Count audit rows without loading them."""
+    return session.scalar(select(func.count(AuditLog.id)))
 
 
 class TestAuditLogModel:
     def test_audit_log_table_exists(self, db_session):
-        from python.helpers.audit import AuditLog
-
         # Table should be created via Base.metadata.create_all
         assert AuditLog.__tablename__ == "audit_log"
 
     def test_create_entry_directly(self, db_session):
-        from datetime import datetime, timezone
-
-        from python.helpers.audit import AuditLog
-
         entry = AuditLog(
             id="test-1",
             user_id=None,
@@ -60,8 +65,6 @@ class TestAuditLogModel:
 
 class TestCreateAuditEntry:
     async def test_creates_entry_in_db(self, db_session):
-        from python.helpers.audit import AuditLog, create_audit_entry
-
         await create_audit_entry(
             user_id=None,
             action="login",
@@ -70,18 +73,15 @@ class TestCreateAuditEntry:
             ip="10.0.0.1",
         )
 
-        entries = db_session.query(AuditLog).all()
-        assert len(entries) == 1
-        assert entries[0].action == "login"
-        assert entries[0].resource == "/login"
-        assert entries[0].ip_address == "10.0.0.1"
+        entry = db_session.query(AuditLog).one()
+        assert entry.action == "login"
+        assert entry.resource == "/login"
+        assert entry.ip_address == "10.0.0.1"
 
-        details = json.loads(entries[0].details_json)
+        details = json.loads(entry.details_json)
         assert details["method"] == "local"
 
     async def test_entry_has_timestamp(self, db_session):
-        from python.helpers.audit import AuditLog, create_audit_entry
-
         await create_audit_entry(user_id=None, action="test")
 
         entry = db_session.query(AuditLog).one()
@@ -89,10 +89,8 @@ class TestCreateAuditEntry:
 
     async def test_entry_with_user_id(self, db_session):
         """Test that user_id FK works when user exists."""
-        import python.helpers.user_store as us
-
         # Create a user first
-        user = us.User(
+        user = User(
             id="user-1",
             email="test@example.com",
             display_name="Test",
@@ -101,8 +99,6 @@ class TestCreateAuditEntry:
         db_session.add(user)
         db_session.flush()
 
-        from python.helpers.audit import AuditLog, create_audit_entry
-
         await create_audit_entry(
             user_id="user-1",
             action="login",
@@ -113,8 +109,6 @@ class TestCreateAuditEntry:
 
     async def test_no_tokens_in_audit(self, db_session):
         """Verify that token values are never stored in audit details."""
-        from python.helpers.audit import AuditLog, create_audit_entry
-
         # Simulate a details dict that should NOT contain token
         await create_audit_entry(
             user_id=None,
@@ -129,8 +123,6 @@ class TestCreateAuditEntry:
 
     async def test_failure_does_not_raise(self, monkeypatch, db_session):
         """Audit log failures should be silently caught."""
-        from python.helpers import audit
-
         # Break the session to force an error
         monkeypatch.setattr(
             audit.auth_db,
@@ -140,25 +132,23 @@ class TestCreateAuditEntry:
 
         # Should not raise
         await audit.create_audit_entry(user_id=None, action="test")
+        assert _audit_count(db_session) == 0
 
 
 class TestLoginAuditEvents:
     async def test_login_events_logged(self, db_session):
-        from python.helpers.audit import AuditLog, create_audit_entry
-
         await create_audit_entry(user_id=None, action="login_failed", resource="/login")
         await create_audit_entry(user_id="u1", action="login", resource="/login")
 
-        entries = db_session.query(AuditLog).order_by(AuditLog.timestamp).all()
-        assert len(entries) == 2
-        assert entries[0].action == "login_failed"
-        assert entries[1].action == "login"
+        assert _audit_count(db_session) == 2
+        actions = db_session.scalars(
+            select(AuditLog.action).order_by(AuditLog.timestamp)
+        ).all()
+        assert actions == ["login_failed", "login"]
 
 
 class TestMcpToolAuditEvents:
     async def test_mcp_tool_invocation_logged(self, db_session):
-        from python.helpers.audit import AuditLog, create_audit_entry
-
         await create_audit_entry(
             user_id="u1",
             action="mcp_tool_invoke",
@@ -4,18 +4,43 @@ Validates progressive delays, account lockout, lockout expiry,
 and success-clears-history behavior.
 """
 
-import time
-from unittest.mock import patch
-
 import pytest
 
 from python.helpers.login_protection import LoginProtection
 
 
+class _FakeClock:
+    """Monotonic clock stand-in that only moves when a test advances it."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(scope="module")
+def _clock():
+    return _FakeClock()
+
+
+@pytest.fixture(scope="module")
+def _protection_instance(_clock):
+    return LoginProtection(clock=_clock)
+
+
+@pytest.fixture
+def clock(_clock):
+    """The shared fake clock, rewound before each test."""
+    _clock.now = 1000.0
+    return _clock
+
+
 @pytest.fixture
-def protection():
-    """Fresh LoginProtection instance for each test."""
-    return LoginProtection()
+def protection(_protection_instance, clock):
+    """Shared LoginProtection instance, emptied before each test."""
+    _protection_instance._state.clear()
+    return _protection_instance
 
 
 class TestProgressiveDelays:
@@ -59,27 +84,26 @@ class TestAccountLockout:
 
 
 class TestLockoutExpiry:
-    def test_lockout_expires_after_duration(self, protection):
+    def test_lockout_expires_after_duration(self, protection, clock):
         for _ in range(5):
             protection.record_failure("carol")
 
         assert protection.check_locked("carol") is True
 
         # Simulate time passing beyond lockout duration
-        with patch.object(time, "monotonic", return_value=time.monotonic() + 301):
-            assert protection.check_locked("carol") is False
+        clock.now += 301
+        assert protection.check_locked("carol") is False
 
-    def test_attempts_pruned_after_lockout_window(self, protection):
+    def test_attempts_pruned_after_lockout_window(self, protection, clock):
         for _ in range(5):
             protection.record_failure("carol")
 
         # Simulate time passing beyond lockout duration
-        future = time.monotonic() + 301
-        with patch.object(time, "monotonic", return_value=future):
-            protection.check_locked("carol")  # triggers cleanup
-            # After cleanup, first failure should return delay 0
-            delay = protection.record_failure("carol")
-            assert delay == 0
+        clock.now += 301
+        protection.check_locked("carol")  # triggers cleanup
+        # After cleanup, first failure should return delay 0
+        delay = protection.record_failure("carol")
+        assert delay == 0
 
 
 class TestSuccessClearsHistory:
@@ -4,22 +4,43 @@ Validates configure_mcp_auth(), _get_mcp_user(), require_scopes_or_token_path(),
 Bearer token fallback routing, and token-in-path coexistence.
 """
 
-from unittest.mock import MagicMock, patch
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+from python.helpers import mcp_server
+from python.helpers.mcp_server import (
+    _MCP_RATE_LIMIT,
+    _MCP_RATE_WINDOW,
+    DynamicMcpProxy,
+    _check_mcp_rate_limit,
+    _get_mcp_user,
+    _mcp_rate_limits,
+    _parse_redirect_uris,
+    _rbac_token_cache,
+    require_rbac_mcp_access,
+    require_scopes_or_token_path,
+)
 
 
 class TestConfigureMcpAuth:
+    @pytest.fixture(autouse=True)
+    def _reset_mcp_auth_state(self):
+        mcp_server._azure_auth_configured = False
+        mcp_server.mcp_server.auth = None
+        yield
+        mcp_server._azure_auth_configured = False
+        mcp_server.mcp_server.auth = None
+
     def test_no_config_when_env_vars_missing(self, monkeypatch):
         """Without MCP_AZURE_* env vars, auth stays None."""
         monkeypatch.delenv("MCP_AZURE_CLIENT_ID", raising=False)
         monkeypatch.delenv("MCP_AZURE_CLIENT_SECRET", raising=False)
         monkeypatch.delenv("MCP_AZURE_TENANT_ID", raising=False)
 
-        from python.helpers import mcp_server
-
-        # Reset state
-        mcp_server._azure_auth_configured = False
-        mcp_server.mcp_server.auth = None
-
         mcp_server.configure_mcp_auth()
 
         assert mcp_server.mcp_server.auth is None
@@ -32,32 +53,17 @@ class TestConfigureMcpAuth:
         monkeypatch.setenv("MCP_AZURE_TENANT_ID", "test-tenant-id")
         monkeypatch.setenv("MCP_SERVER_BASE_URL", "http://localhost:50080")
 
-        from python.helpers import mcp_server
-
-        # Reset state
-        mcp_server._azure_auth_configured = False
-        mcp_server.mcp_server.auth = None
-
         mcp_server.configure_mcp_auth()
 
         assert mcp_server.mcp_server.auth is not None
         assert mcp_server._azure_auth_configured is True
 
-        # Clean up
-        mcp_server.mcp_server.auth = None
-        mcp_server._azure_auth_configured = False
-
     def test_partial_env_vars_skips_config(self, monkeypatch):
         """With only some MCP_AZURE_* env vars, auth stays None."""
         monkeypatch.setenv("MCP_AZURE_CLIENT_ID", "test-client-id")
         monkeypatch.delenv("MCP_AZURE_CLIENT_SECRET", raising=False)
         monkeypatch.delenv("MCP_AZURE_TENANT_ID", raising=False)
 
-        from python.helpers import mcp_server
-
-        mcp_server._azure_auth_configured = False
-        mcp_server.mcp_server.auth = None
-
         mcp_server.configure_mcp_auth()
 
         assert mcp_server.mcp_server.auth is None
@@ -68,15 +74,11 @@ class TestParseRedirectUris:
     def test_empty_returns_none(self, monkeypatch):
         monkeypatch.delenv("MCP_AZURE_REDIRECT_URIS", raising=False)
 
-        from python.helpers.mcp_server import _parse_redirect_uris
-
         assert _parse_redirect_uris() is None
 
     def test_single_uri(self, monkeypatch):
         monkeypatch.setenv("MCP_AZURE_REDIRECT_URIS", "http://localhost:50080/callback")
 
-        from python.helpers.mcp_server import _parse_redirect_uris
-
         result = _parse_redirect_uris()
         assert result == ["http://localhost:50080/callback"]
 
@@ -86,8 +88,6 @@ class TestParseRedirectUris:
             "http://localhost:50080/callback, https://app.example.com/callback",
         )
 
-        from python.helpers.mcp_server import _parse_redirect_uris
-
         result = _parse_redirect_uris()
         assert len(result) == 2
         assert "http://localhost:50080/callback" in result
@@ -95,45 +95,32 @@ class TestParseRedirectUris:
 
 
 class TestRequireScopesOrTokenPath:
-    def test_none_token_passes(self):
+    def test_none_token_passes(self, mcp_auth_ctx):
         """Token-in-path mode: no Bearer token present."""
-        from python.helpers.mcp_server import require_scopes_or_token_path
-
         check = require_scopes_or_token_path("chat")
-        ctx = MagicMock()
-        ctx.token = None
-        assert check(ctx) is True
-
-    def test_token_with_required_scopes_passes(self):
-        from python.helpers.mcp_server import require_scopes_or_token_path
-
-        check = require_scopes_or_token_path("chat", "tools.read")
-        ctx = MagicMock()
-        ctx.token = MagicMock()
-        ctx.token.scopes = ["chat", "tools.read", "discover"]
+        ctx = mcp_auth_ctx(bearer=False)
         assert check(ctx) is True
 
-    def test_token_missing_scope_fails(self):
-        from python.helpers.mcp_server import require_scopes_or_token_path
-
-        check = require_scopes_or_token_path("chat", "admin")
-        ctx = MagicMock()
-        ctx.token = MagicMock()
-        ctx.token.scopes = ["chat"]
-        assert check(ctx) is False
+    @pytest.mark.parametrize(
+        "required, scopes, expected",
+        [
+            (("chat", "tools.read"), ["chat", "tools.read", "discover"], True),
+            (("chat", "admin"), ["chat"], False),
+        ],
+        ids=["required_scopes_present", "missing_scope"],
+    )
+    def test_bearer_scope_check(self, required, scopes, expected, mcp_auth_ctx):
+        check = require_scopes_or_token_path(*required)
+        assert check(mcp_auth_ctx(scopes=scopes)) is expected
 
 
 class TestGetMcpUser:
     async def test_returns_none_without_token(self):
-        from python.helpers.mcp_server import _get_mcp_user
-
         with patch("python.helpers.mcp_server.get_access_token", return_value=None):
             result = await _get_mcp_user()
             assert result is None
 
     async def test_returns_user_from_token_claims(self):
-        from python.helpers.mcp_server import _get_mcp_user
-
         mock_token = MagicMock()
         mock_token.claims = {
             "oid": "user-oid-123",
@@ -156,28 +143,23 @@ class TestGetMcpUser:
 
 
 class TestRequireRbacMcpAccess:
-    def test_none_token_passes(self):
+    def test_none_token_passes(self, mcp_auth_ctx):
         """Token-in-path mode passes unconditionally."""
-        from python.helpers.mcp_server import require_rbac_mcp_access
-
-        ctx = MagicMock()
-        ctx.token = None
+        ctx = mcp_auth_ctx(bearer=False)
         assert require_rbac_mcp_access(ctx) is True
 
-    def test_no_oid_claim_fails(self):
-        from python.helpers.mcp_server import require_rbac_mcp_access
-
-        ctx = MagicMock()
-        ctx.token = MagicMock()
-        ctx.token.claims = {}
+    def test_no_oid_claim_fails(self, mcp_auth_ctx):
+        ctx = mcp_auth_ctx(claims={})
         assert require_rbac_mcp_access(ctx) is False
 
-    def test_unknown_user_fails(self):
-        from python.helpers.mcp_server import require_rbac_mcp_access
+    def test_missing_claims_fail_without_db(self, mcp_auth_ctx):
+        ctx = mcp_auth_ctx(claims=None)
+        with patch("python.helpers.auth_db.get_session") as get_session:
+            assert require_rbac_mcp_access(ctx) is False
+        get_session.assert_not_called()
 
-        ctx = MagicMock()
-        ctx.token = MagicMock()
-        ctx.token.claims = {"oid": "unknown-user"}
+    def test_unknown_user_fails(self, mcp_auth_ctx):
+        ctx = mcp_auth_ctx(claims={"oid": "unknown-user"})
 
         # Mock the DB lookup to return None (imports happen inside function body)
         mock_session = MagicMock()
@@ -191,12 +173,8 @@ class TestRequireRbacMcpAccess:
         ):
             assert require_rbac_mcp_access(ctx) is False
 
-    def test_rbac_exception_fails_gracefully(self):
-        from python.helpers.mcp_server import require_rbac_mcp_access
-
-        ctx = MagicMock()
-        ctx.token = MagicMock()
-        ctx.token.claims = {"oid": "test-user"}
+    def test_rbac_exception_fails_gracefully(self, mcp_auth_ctx):
+        ctx = mcp_auth_ctx(claims={"oid": "test-user"})
 
         with patch(
             "python.helpers.auth_db.get_session",
@@ -206,59 +184,93 @@ class TestRequireRbacMcpAccess:
             result = require_rbac_mcp_access(ctx)
             assert result is False
 
+    def test_decision_cached_per_bearer_token(self, mcp_auth_ctx):
+        _rbac_token_cache.clear()
+        ctx = mcp_auth_ctx(
+            token="raw-bearer-token",
+            expires_at=None,
+            claims={"oid": "cached-user"},
+        )
+
+        with (
+            patch("python.helpers.auth_db.get_session") as get_session,
+            patch("python.helpers.user_store.get_user_by_id", return_value=None),
+        ):
+            assert require_rbac_mcp_access(ctx) is False
+            assert require_rbac_mcp_access(ctx) is False
+            assert get_session.call_count == 1
+
+        # An expired token is never cached
+        _rbac_token_cache.clear()
+        ctx.token.expires_at = 0
+        with (
+            patch("python.helpers.auth_db.get_session") as get_session,
+            patch("python.helpers.user_store.get_user_by_id", return_value=None),
+        ):
+            require_rbac_mcp_access(ctx)
+            require_rbac_mcp_access(ctx)
+            assert get_session.call_count == 2
+        _rbac_token_cache.clear()
+
 
 class TestMcpRateLimiting:
     def test_within_limit_passes(self):
-        from python.helpers.mcp_server import _check_mcp_rate_limit, _mcp_rate_limits
-
         _mcp_rate_limits.clear()
         assert _check_mcp_rate_limit("user1") is True
 
     def test_over_limit_fails(self):
-        from python.helpers.mcp_server import (
-            _MCP_RATE_LIMIT,
-            _check_mcp_rate_limit,
-            _mcp_rate_limits,
-        )
-
         _mcp_rate_limits.clear()
         for _ in range(_MCP_RATE_LIMIT):
             _check_mcp_rate_limit("user2")
         assert _check_mcp_rate_limit("user2") is False
 
     def test_different_users_independent(self):
-        from python.helpers.mcp_server import (
-            _MCP_RATE_LIMIT,
-            _check_mcp_rate_limit,
-            _mcp_rate_limits,
-        )
-
         _mcp_rate_limits.clear()
         for _ in range(_MCP_RATE_LIMIT):
             _check_mcp_rate_limit("user3")
         # user3 is at limit, but user4 should be fine
         assert _check_mcp_rate_limit("user4") is True
 
+    def test_limit_resets_after_window(self):
+        _mcp_rate_limits.clear()
+        for _ in range(_MCP_RATE_LIMIT):
+            _check_mcp_rate_limit("user5")
+        assert _check_mcp_rate_limit("user5") is False
+
+        later = time.monotonic() + _MCP_RATE_WINDOW
+        with patch.object(time, "monotonic", return_value=later):
+            assert _check_mcp_rate_limit("user5") is True
+
+    def test_no_double_burst_across_window_boundary(self):
+        _mcp_rate_limits.clear()
+        start = time.monotonic()
+        with patch.object(time, "monotonic", return_value=start):
+            for _ in range(_MCP_RATE_LIMIT):
+                _check_mcp_rate_limit("user6")
+
+        # Just past the boundary the previous window still almost fully counts
+        just_after = start + _MCP_RATE_WINDOW + 1
+        with patch.object(time, "monotonic", return_value=just_after):
+            allowed = sum(
+                _check_mcp_rate_limit("user6") for _ in range(_MCP_RATE_LIMIT)
+            )
+        assert allowed < _MCP_RATE_LIMIT // 10
+
 
 class TestDynamicMcpProxyBearerFallback:
     async def test_bearer_fallback_routes_to_http_app_when_auth_configured(self):
         """When auth is configured and path is /http without token, route to http_app."""
-        from unittest.mock import AsyncMock
-
-        from python.helpers import mcp_server as mcp_mod
-        from python.helpers.mcp_server import DynamicMcpProxy
-
         proxy = DynamicMcpProxy.__new__(DynamicMcpProxy)
         proxy.token = "test-token-abc"
-        proxy._lock = __import__("threading").RLock()
+        proxy._lock = threading.RLock()
 
         # Create mock ASGI apps
         proxy.sse_app = AsyncMock()
         proxy.http_app = AsyncMock()
 
         # Simulate auth being configured
-        original_auth = mcp_mod.mcp_server.auth
-        mcp_mod.mcp_server.auth = MagicMock()
+        original_auth = mcp_server.mcp_server.auth
+        mcp_server.mcp_server.auth = MagicMock()
         try:
             # Request to /http WITHOUT a token in path — should trigger bearer fallback
             scope = {"type": "http", "path": "/http"}
@@ -273,35 +285,26 @@ class TestDynamicMcpProxyBearerFallback:
             called_scope = call_args[0][0]
             assert called_scope["path"] == f"/t-{proxy.token}/http"
         finally:
-            mcp_mod.mcp_server.auth = original_auth
+            mcp_server.mcp_server.auth = original_auth
 
     async def test_no_bearer_fallback_when_auth_not_configured(self):
         """When auth is NOT configured, /http without token should raise 403."""
-        from unittest.mock import AsyncMock
-
-        from starlette.exceptions import HTTPException as StarletteHTTPException
-
-        from python.helpers import mcp_server as mcp_mod
-        from python.helpers.mcp_server import DynamicMcpProxy
-
         proxy = DynamicMcpProxy.__new__(DynamicMcpProxy)
         proxy.token = "test-token-xyz"
-        proxy._lock = __import__("threading").RLock()
+        proxy._lock = threading.RLock()
         proxy.sse_app = AsyncMock()
         proxy.http_app = AsyncMock()
 
         # Ensure auth is NOT configured
-        original_auth = mcp_mod.mcp_server.auth
-        mcp_mod.mcp_server.auth = None
+        original_auth = mcp_server.mcp_server.auth
+        mcp_server.mcp_server.auth = None
         try:
             scope = {"type": "http", "path": "/http"}
             receive = AsyncMock()
             send = AsyncMock()
 
-            import pytest
-
             with pytest.raises(StarletteHTTPException) as exc_info:
                 await proxy(scope, receive, send)
             assert exc_info.value.status_code == 403
         finally:
-            mcp_mod.mcp_server.auth = original_auth
+            mcp_server.mcp_server.auth = original_auth
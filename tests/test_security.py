@@ -5,17 +5,38 @@ sanitization, file permissions, SSH host key policy, HMAC token derivation,
 sandboxing gates, security headers, and backup name sanitization.
 """
 
+import base64
 import hashlib
 import hmac
 import json
 import os
+import re
+import shutil
 import stat
 import threading
 from unittest.mock import patch
 
+import pytest
 from flask import Flask
+from flask import request as flask_request
+from flask_limiter import Limiter
 
-from python.helpers import files, runtime
+from python.helpers import dotenv, files, login, runtime, settings
+from python.helpers.api import ApiHandler
+from python.helpers.backup import BackupService
+from python.helpers.errors import format_error
+from python.helpers.shell_ssh import _is_local_or_private
+
+# Same character class BackupService.create_backup uses to sanitize names
+_BACKUP_NAME_RE = re.compile(r"[^\w\-]")
+
+
+@pytest.fixture(scope="module")
+def run_ui():
+    """The ``run_ui`` module, imported on first use so collection stays cheap."""
+    import run_ui
+
+    return run_ui
 
 
 # ---------------------------------------------------------------------------
@@ -96,16 +117,13 @@ class TestNullByteRejection:
 # ---------------------------------------------------------------------------
 # 3. Error Response Sanitization
 # ---------------------------------------------------------------------------
+@pytest.mark.asyncio(loop_scope="class")
 class TestErrorResponseSanitization:
     """API error handler must hide sensitive details in production mode."""
 
     @patch.object(runtime, "is_development", return_value=False)
     async def test_api_error_no_traceback_in_production(self, _mock_dev):
         """In production, API errors must return a generic message."""
-        from flask import request as flask_request
-
-        from python.helpers.api import ApiHandler
-
         app = Flask(__name__)
         app.secret_key = "test-secret"
 
@@ -128,10 +146,6 @@ class TestErrorResponseSanitization:
     @patch.object(runtime, "is_development", return_value=True)
     async def test_api_error_hides_detail_in_dev(self, _mock_dev):
         """Even in development, API errors must not expose stack traces to clients."""
-        from flask import request as flask_request
-
-        from python.helpers.api import ApiHandler
-
         app = Flask(__name__)
         app.secret_key = "test-secret"
 
@@ -152,10 +166,6 @@ class TestErrorResponseSanitization:
     @patch.object(runtime, "is_development", return_value=False)
     async def test_production_error_is_valid_json(self, _mock_dev):
         """Production error response must be valid JSON with 'error' key."""
-        from flask import request as flask_request
-
-        from python.helpers.api import ApiHandler
-
         app = Flask(__name__)
         app.secret_key = "test-secret"
 
@@ -194,8 +204,6 @@ class TestFilePermissions:
 
     def test_delete_dir_uses_owner_only_chmod_on_retry(self, tmp_path, monkeypatch):
         """delete_dir retry path must use 0o700 (owner-only), not 0o777."""
-        import shutil
-
         target = tmp_path / "stubborn_dir"
         target.mkdir()
         child_file = target / "child.txt"
@@ -235,8 +243,6 @@ class TestFilePermissions:
 
     def test_dotenv_chmod_is_owner_only(self, tmp_path, monkeypatch):
         """save_dotenv_value must restrict .env to owner-only (0o600) permissions."""
-        from python.helpers import dotenv
-
         env_file = tmp_path / ".env"
         env_file.write_text("")
         # Make the file world-readable initially to prove chmod changes it
@@ -262,39 +268,27 @@ class TestSSHHostKeyPolicy:
     """Verify the _is_local_or_private guard in shell_ssh.py."""
 
     def test_localhost_is_local_or_private(self):
-        from python.helpers.shell_ssh import _is_local_or_private
-
         assert _is_local_or_private("localhost")
         assert _is_local_or_private("127.0.0.1")
         assert _is_local_or_private("::1")
 
     def test_private_ips_are_local_or_private(self):
-        from python.helpers.shell_ssh import _is_local_or_private
-
         assert _is_local_or_private("192.168.1.1")
         assert _is_local_or_private("10.0.0.1")
         assert _is_local_or_private("172.16.0.1")
 
     def test_public_ips_are_not_local_or_private(self):
-        from python.helpers.shell_ssh import _is_local_or_private
-
         assert not _is_local_or_private("8.8.8.8")
         assert not _is_local_or_private("1.1.1.1")
 
     def test_hostnames_are_not_local_or_private(self):
-        from python.helpers.shell_ssh import _is_local_or_private
-
         assert not _is_local_or_private("example.com")
         assert not _is_local_or_private("ssh.remote-server.com")
 
     def test_link_local_ipv4_is_private(self):
-        from python.helpers.shell_ssh import _is_local_or_private
-
         assert _is_local_or_private("169.254.1.1")
 
     def test_link_local_ipv6_is_private(self):
-        from python.helpers.shell_ssh import _is_local_or_private
-
         assert _is_local_or_private("fe80::1")
 
 
@@ -306,8 +300,6 @@ class TestHMACTokenDerivation:
 
     def test_login_produces_hmac_sha256_output(self, monkeypatch):
         """login.get_credentials_hash must return an HMAC-SHA256 hex digest."""
-        from python.helpers import login
-
         fake_persistent_id = "test-persistent-id-12345"
         test_user = "admin"
         test_password = "secret"
@@ -342,8 +334,6 @@ class TestHMACTokenDerivation:
 
     def test_login_returns_none_without_credentials(self, monkeypatch):
         """login.get_credentials_hash returns None when AUTH_LOGIN is not set."""
-        from python.helpers import login
-
         monkeypatch.setattr(
             "python.helpers.dotenv.get_dotenv_value",
             lambda key, default=None: default,
@@ -352,8 +342,6 @@ class TestHMACTokenDerivation:
 
     def test_settings_produces_hmac_sha256_output(self, monkeypatch):
         """settings.create_auth_token must return an HMAC-SHA256-derived token."""
-        from python.helpers import settings
-
         fake_persistent_id = "test-persistent-id-67890"
         test_user = "admin"
         test_password = "secret"
@@ -373,8 +361,6 @@ class TestHMACTokenDerivation:
         result = settings.create_auth_token()
 
         # Compute expected HMAC-SHA256 base64-encoded token
-        import base64
-
         expected_bytes = hmac.new(
             fake_persistent_id.encode(),
             f"{test_user}:{test_password}".encode(),
@@ -387,10 +373,6 @@ class TestHMACTokenDerivation:
 
     def test_settings_token_differs_from_bare_sha256(self, monkeypatch):
         """settings.create_auth_token must NOT match a bare SHA-256 derivation."""
-        from python.helpers import settings
-
-        import base64
-
         fake_persistent_id = "test-persistent-id-abcdef"
         test_user = "admin"
         test_password = "pass123"
@@ -426,29 +408,26 @@ class TestCodeExecutionSandboxing:
     sys.stdin.reconfigure() -- incompatible with pytest's stdin.
     """
 
-    @staticmethod
-    def _read_source():
+    @pytest.fixture(scope="class")
+    def source(self):
         source_path = os.path.join(
             files.get_base_dir(), "python", "tools", "code_execution_tool.py"
         )
         with open(source_path, "r") as f:
             return f.read()
 
-    def test_sandboxing_gate_exists_in_source(self):
+    def test_sandboxing_gate_exists_in_source(self, source):
         """prepare_state must enforce SSH sandboxing in production."""
-        source = self._read_source()
         assert "Code execution requires SSH sandboxing" in source
         assert "is_development" in source
 
-    def test_sandboxing_gate_raises_in_production_path(self):
+    def test_sandboxing_gate_raises_in_production_path(self, source):
         """The error message must reference SSH and production settings."""
-        source = self._read_source()
         assert "code_exec_ssh_enabled" in source
         assert "DEVELOPMENT_MODE" in source
 
-    def test_sandboxing_gate_warns_in_dev_path(self):
+    def test_sandboxing_gate_warns_in_dev_path(self, source):
         """Development mode must log a warning about unsandboxed execution."""
-        source = self._read_source()
         assert "UNSANDBOXED" in source
         assert "development mode only" in source
 
@@ -459,10 +438,8 @@ class TestCodeExecutionSandboxing:
 class TestSecurityHeaders:
     """Verify security response headers are applied at runtime via Flask test client."""
 
-    def test_run_ui_security_headers_are_set(self):
+    def test_run_ui_security_headers_are_set(self, run_ui):
         """Responses must include X-Content-Type-Options, X-Frame-Options, CSP, and Referrer-Policy."""
-        import run_ui
-
         with run_ui.webapp.test_client() as client:
             response = client.get("/manifest.json")
             headers = response.headers
@@ -471,10 +448,8 @@ class TestSecurityHeaders:
             assert headers.get("Content-Security-Policy") is not None
             assert headers.get("Referrer-Policy") is not None
 
-    def test_run_ui_has_cors_configuration(self):
+    def test_run_ui_has_cors_configuration(self, run_ui):
         """run_ui.webapp must have a flask_cors after_request handler registered."""
-        import run_ui
-
         # flask_cors registers a cors_after_request handler on the app
         after_request_fns = run_ui.webapp.after_request_funcs.get(None, [])
         has_cors = any(
@@ -483,17 +458,12 @@ class TestSecurityHeaders:
         )
         assert has_cors, "flask_cors after_request handler not registered on Flask app"
 
-    def test_run_ui_has_rate_limiter(self):
+    def test_run_ui_has_rate_limiter(self, run_ui):
         """run_ui.limiter must be a flask_limiter.Limiter instance."""
-        import run_ui
-        from flask_limiter import Limiter
-
         assert isinstance(run_ui.limiter, Limiter)
 
-    def test_security_header_values_are_strict(self):
+    def test_security_header_values_are_strict(self, run_ui):
         """Verify specific header values are set to strict options."""
-        import run_ui
-
         with run_ui.webapp.test_client() as client:
             response = client.get("/manifest.json")
             headers = response.headers
@@ -503,16 +473,12 @@ class TestSecurityHeaders:
             csp = headers.get("Content-Security-Policy", "")
             assert "frame-ancestors 'none'" in csp
 
-    def test_session_cookie_samesite(self):
+    def test_session_cookie_samesite(self, run_ui):
         """Session cookie must use SameSite=Lax (required for OIDC redirects)."""
-        import run_ui
-
         assert run_ui.webapp.config["SESSION_COOKIE_SAMESITE"] == "Lax"
 
-    def test_csrf_protection_exists(self):
+    def test_csrf_protection_exists(self, run_ui):
         """run_ui must define a csrf_protect decorator that checks X-CSRF-Token."""
-        import run_ui
-
         # Verify the csrf_protect function exists and is callable
         assert callable(run_ui.csrf_protect)
 
@@ -541,8 +507,6 @@ class TestBackupNameSanitization:
 
     async def test_backup_name_sanitized_in_zip_path(self, monkeypatch):
         """create_backup must sanitize dangerous chars from backup_name in output path."""
-        from python.helpers.backup import BackupService
-
         svc = BackupService()
 
         # Mock test_patterns to return a single fake file so create_backup proceeds
@@ -588,27 +552,21 @@ class TestBackupNameSanitization:
 
     def test_backup_name_sanitization_rejects_slashes(self):
         """The sanitization must strip path separator characters from backup names."""
-        import re
-
         dangerous_name = "../../etc/evil-backup"
-        sanitized = re.sub(r"[^\w\-]", "_", dangerous_name)
+        sanitized = _BACKUP_NAME_RE.sub("_", dangerous_name)
         assert "/" not in sanitized
         assert ".." not in sanitized
 
     def test_backup_name_sanitization_preserves_safe_chars(self):
         """Safe characters (alphanumeric, hyphen, underscore) must be preserved."""
-        import re
-
         safe_name = "my-backup_2025-01-15"
-        sanitized = re.sub(r"[^\w\-]", "_", safe_name)
+        sanitized = _BACKUP_NAME_RE.sub("_", safe_name)
         assert sanitized == safe_name
 
     def test_backup_name_sanitization_strips_null_bytes(self):
         """Null bytes in backup names must be replaced."""
-        import re
-
         null_name = "backup\x00evil"
-        sanitized = re.sub(r"[^\w\-]", "_", null_name)
+        sanitized = _BACKUP_NAME_RE.sub("_", null_name)
         assert "\x00" not in sanitized
 
 
@@ -620,8 +578,6 @@ class TestCrossCuttingSecurity:
 
     def test_format_error_includes_traceback_text(self):
         """format_error must return traceback content (used by dev mode)."""
-        from python.helpers.errors import format_error
-
         try:
             raise ValueError("test error for format_error")
         except ValueError as e: